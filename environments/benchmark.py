@@ -0,0 +1,294 @@
+"""
+Throughput benchmark for the environments in this package.
+
+For every environment it measures steps/sec, resets/sec and the per-call step
+latency percentiles, both for the scalar step() and for the batched/table-driven
+paths (VectorGridEnv, VectorBlackjack, BatchedBanditEnvironment). Results are
+written as JSON and can be compared with a stored baseline:
+
+    python -m environments.benchmark --output bench.json --baseline environments/benchmark_baseline.json
+
+The exit code is 1 when a case is slower than the baseline by more than --tolerance.
+
+environments/benchmark_baseline.json is the reference report kept in the repository;
+it holds the medians of five runs (--runs 5) and its "meta" field records the
+machine, Python and NumPy it was measured with. Throughput depends on the machine,
+so compare against it on similar hardware, or regenerate it
+(--runs 5 --output environments/benchmark_baseline.json) when the reference machine
+changes.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from environments.blackjack import Blackjack
+from environments.cliff_walking import CliffWalking
+from environments.frozen_lake import FrozenLake
+from environments.grid_world import SimpleGridWorld
+from environments.multibandit_problem import BanditEnvironment, BatchedBanditEnvironment
+from environments.vector_blackjack import VectorBlackjack
+from environments.vector_grid import VectorGridEnv
+from environments.windy_grid_world import WindyGridWorld
+
+PERCENTILES = (50, 90, 99)
+# Come timeit: throughput e reset sono il migliore di REPEATS passaggi
+REPEATS = 5
+# Numero di copie per i percorsi vettoriali
+BATCH_SIZE = 1024
+
+
+def _summary(elapsed, num_steps, step_ns, steps_per_call, reset_seconds, num_resets):
+    """Aggregates raw timings into the JSON record of one case."""
+    return {
+        "batch_size": steps_per_call,
+        "steps_per_sec": num_steps * steps_per_call / elapsed,
+        "resets_per_sec": num_resets / reset_seconds,
+        "latency_us": {f"p{q}": float(np.percentile(step_ns, q)) / 1e3 for q in PERCENTILES},
+    }
+
+
+def _best_time(fn, *args):
+    """Shortest wall time of REPEATS calls of fn(*args), as in timeit."""
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _reset_loop(reset, num_resets):
+    for _ in range(num_resets):
+        reset()
+
+
+def _episode_loop(env, actions, step_ns=None):
+    """
+    Steps env through actions, resetting when an episode ends.
+
+    With step_ns every call is timed individually (latency pass); otherwise only the
+    whole loop is timed by the caller (throughput pass, free of timer overhead).
+    """
+    clock = time.perf_counter_ns
+    env.reset()
+    for i, action in enumerate(actions):
+        if step_ns is not None:
+            start = clock()
+            result = env.step(action)
+            step_ns[i] = clock() - start
+        else:
+            result = env.step(action)
+        # Fine episodio: terminated (o truncated per le API a 5 elementi)
+        if result[2] or (len(result) == 5 and result[3]):
+            env.reset()
+
+
+def bench_scalar(env, num_steps, num_resets, rng):
+    """
+    Times env.step one call at a time with random actions.
+
+    Works for every environment whose step returns done as its third element
+    (grid worlds and Blackjack).
+    """
+    actions = rng.integers(0, env.action_space.n, num_steps).tolist()
+    elapsed = _best_time(_episode_loop, env, actions)
+    step_ns = np.empty(num_steps, dtype=np.int64)
+    _episode_loop(env, actions, step_ns)
+    return _summary(elapsed, num_steps, step_ns, 1, _best_time(_reset_loop, env.reset, num_resets), num_resets)
+
+
+def _call_loop(step, actions, step_ns=None):
+    clock = time.perf_counter_ns
+    for i, action in enumerate(actions):
+        if step_ns is not None:
+            start = clock()
+            step(action)
+            step_ns[i] = clock() - start
+        else:
+            step(action)
+
+
+def bench_bandit(env, num_steps, num_resets, rng):
+    """Times BanditEnvironment.get_reward with random arms."""
+    actions = rng.integers(0, env.k, num_steps).tolist()
+    elapsed = _best_time(_call_loop, env.get_reward, actions)
+    step_ns = np.empty(num_steps, dtype=np.int64)
+    _call_loop(env.get_reward, actions, step_ns)
+    return _summary(elapsed, num_steps, step_ns, 1, _best_time(_reset_loop, env.reset, num_resets), num_resets)
+
+
+def bench_batched(step, reset, n_actions, num_envs, num_calls, num_resets, rng):
+    """
+    Times a batched step(actions) that advances num_envs copies per call.
+
+    steps_per_sec counts environment steps (num_envs per call); latencies are per call.
+    """
+    actions = rng.integers(0, n_actions, (num_calls, num_envs))
+    reset()
+    elapsed = _best_time(_call_loop, step, actions)
+    step_ns = np.empty(num_calls, dtype=np.int64)
+    _call_loop(step, actions, step_ns)
+    return _summary(elapsed, num_calls, step_ns, num_envs, _best_time(_reset_loop, reset, num_resets), num_resets)
+
+
+def _vector_blackjack_step(env):
+    # Le mani finite vengono ridistribuite, come l'auto-reset di VectorGridEnv
+    def step(actions):
+        if env.done.all():
+            env.reset()
+        return env.step(actions)
+    return step
+
+
+def run_benchmarks(num_steps=20_000, num_resets=2_000, num_calls=500, seed=0):
+    """
+    Runs every benchmark case.
+
+    Parameters:
+        num_steps (int): Scalar step calls per case.
+        num_resets (int): Reset calls per case.
+        num_calls (int): Batched step calls per case (each advances BATCH_SIZE copies).
+        seed (int): Seed of the action generator.
+
+    Returns:
+        dict: Case name -> summary (steps_per_sec, resets_per_sec, latency_us, batch_size).
+    """
+    rng = np.random.default_rng(seed)
+    grid_envs = {
+        "SimpleGridWorld": SimpleGridWorld,
+        "WindyGridWorld": WindyGridWorld,
+        "CliffWalking": CliffWalking,
+        "FrozenLake": FrozenLake,
+    }
+    results = {}
+    for name, env_class in grid_envs.items():
+        results[name] = bench_scalar(env_class(), num_steps, num_resets, rng)
+        results[f"{name}[flat_obs]"] = bench_scalar(env_class(flat_obs=True), num_steps, num_resets, rng)
+        vec = VectorGridEnv(env_class(), BATCH_SIZE, seed=seed)
+        results[f"VectorGridEnv[{name}]"] = bench_batched(
+            vec.step, vec.reset, vec.n_actions, BATCH_SIZE, num_calls, num_resets, rng)
+
+    results["FrozenLake[size=256]"] = bench_scalar(
+        FrozenLake(size=256, hole_density=0.1, seed=seed, flat_obs=True), num_steps, num_resets, rng)
+    results["FrozenLake[slippery]"] = bench_scalar(
+        FrozenLake(slippery=True, seed=seed), num_steps, num_resets, rng)
+    results["Blackjack"] = bench_scalar(Blackjack(seed=seed), num_steps, num_resets, rng)
+    vec = VectorBlackjack(BATCH_SIZE, seed=seed)
+    results["VectorBlackjack"] = bench_batched(
+        _vector_blackjack_step(vec), vec.reset, 2, BATCH_SIZE, num_calls, num_resets, rng)
+
+    results["BanditEnvironment"] = bench_bandit(
+        BanditEnvironment(rng=np.random.default_rng(seed), tape_length=0), num_steps, num_resets, rng)
+    results["BanditEnvironment[tape]"] = bench_bandit(
+        BanditEnvironment(rng=np.random.default_rng(seed), tape_length=1000), num_steps, num_resets, rng)
+    bandits = BatchedBanditEnvironment(BATCH_SIZE, rng=np.random.default_rng(seed))
+    results["BatchedBanditEnvironment"] = bench_batched(
+        bandits.get_rewards, bandits.reset, bandits.k, BATCH_SIZE, num_calls, num_resets, rng)
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compares results with a baseline produced by this script.
+
+    Parameters:
+        results (dict): Output of run_benchmarks.
+        baseline (dict): Stored results (the "results" field of a previous JSON report).
+        tolerance (float): Allowed relative slowdown of steps/sec and resets/sec.
+
+    Returns:
+        list of str: One message per regression (empty if none).
+    """
+    regressions = []
+    for name, base in baseline.items():
+        if name not in results:
+            continue
+        for metric in ("steps_per_sec", "resets_per_sec"):
+            ratio = results[name][metric] / base[metric]
+            if ratio < 1.0 - tolerance:
+                regressions.append(f"{name}: {metric} {results[name][metric]:,.0f} vs baseline "
+                                   f"{base[metric]:,.0f} ({ratio - 1:+.1%})")
+    return regressions
+
+
+def median_results(runs):
+    """
+    Per-case median of several run_benchmarks outputs (every metric separately), so a
+    single unusually fast or slow run does not end up in a stored baseline.
+    """
+    def median(records):
+        if isinstance(records[0], dict):
+            return {key: median([record[key] for record in records]) for key in records[0]}
+        return float(np.median(records))
+
+    return {name: dict(median([run[name] for run in runs]), batch_size=runs[0][name]["batch_size"])
+            for name in runs[0]}
+
+
+def _print_table(results):
+    print(f"{'case':<36} {'steps/s':>14} {'resets/s':>12} " +
+          " ".join(f"{f'p{q} us':>9}" for q in PERCENTILES))
+    for name, r in results.items():
+        latencies = " ".join(f"{r['latency_us'][f'p{q}']:>9.2f}" for q in PERCENTILES)
+        print(f"{name:<36} {r['steps_per_sec']:>14,.0f} {r['resets_per_sec']:>12,.0f} {latencies}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark environment throughput.")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    parser.add_argument("--baseline", help="JSON report to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative slowdown before a case counts as a regression.")
+    parser.add_argument("--steps", type=int, default=20_000, help="Scalar step calls per case.")
+    parser.add_argument("--resets", type=int, default=2_000, help="Reset calls per case.")
+    parser.add_argument("--calls", type=int, default=500, help="Batched step calls per case.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--runs", type=int, default=1,
+                        help="Repeat the whole benchmark and report the per-case medians.")
+    args = parser.parse_args(argv)
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+
+    runs = [run_benchmarks(args.steps, args.resets, args.calls, args.seed) for _ in range(args.runs)]
+    results = runs[0] if args.runs == 1 else median_results(runs)
+    _print_table(results)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "runs": args.runs,
+            "steps": args.steps,
+            "resets": args.resets,
+            "calls": args.calls,
+            "batch_size": BATCH_SIZE,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,52 @@
-import random
+from functools import lru_cache
+
 import gym
 from gym import spaces
+import numpy as np
+
+from environments.random_buffers import choice_buffer
+
+# Mazzo infinito: ogni carta ha probabilità 1/13 (le figure valgono 10)
+DECK = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10)
+# Somma finale massima del mazziere: 16 + 10
+MAX_DEALER_SUM = 26
+
+
+@lru_cache(maxsize=None)
+def dealer_outcomes(dealer_sum):
+    """
+    Distribuzione esatta della somma finale del mazziere partendo da dealer_sum.
+
+    Il mazziere pesca finché la somma è < 17 (assi contati come 1), come in
+    Blackjack.step. Partendo dalla carta visibile si ottiene la distribuzione per
+    ogni up-card; i risultati sono memorizzati per ogni somma intermedia.
+
+    Parameters:
+        dealer_sum (int): Somma corrente del mazziere (es. la carta visibile).
+
+    Returns:
+        np.ndarray: Array di sola lettura di lunghezza MAX_DEALER_SUM + 1 con la
+        probabilità di ogni somma finale.
+    """
+    probs = np.zeros(MAX_DEALER_SUM + 1)
+    if dealer_sum >= 17:
+        probs[dealer_sum] = 1.0
+    else:
+        for card in DECK:
+            probs += dealer_outcomes(dealer_sum + card)
+        probs /= len(DECK)
+    probs.flags.writeable = False
+    return probs
+
+
+@lru_cache(maxsize=None)
+def stick_reward(player_sum, dealer_card):
+    """Ricompensa attesa dell'azione 'stick' con somma player_sum contro la carta dealer_card."""
+    probs = dealer_outcomes(dealer_card)
+    sums = np.arange(MAX_DEALER_SUM + 1)
+    win = (sums > 21) | (sums < player_sum)
+    lose = (sums <= 21) & (sums > player_sum)
+    return float(probs[win].sum() - probs[lose].sum())
 
 
 class Blackjack(gym.Env):
@@ -10,7 +56,11 @@ class Blackjack(gym.Env):
     The goal is to get as close to 21 points without going over.
     """
 
-    def __init__(self):
+    def __init__(self, seed=None):
+        """
+        Parameters:
+            seed (int, np.random.Generator or None): Seed or generator used to deal the cards.
+        """
         super(Blackjack, self).__init__()
 
         # Definizione dello spazio delle azioni
@@ -26,12 +76,89 @@ class Blackjack(gym.Env):
         ))
 
         # Elenco delle carte (dal mazzo infinito)
-        self.deck = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10]  # Assi contati come 1
+        self.deck = list(DECK)  # Assi contati come 1
         self.state = None
         self.done = False
 
-    def reset(self):
-        """Reset the environment to start a new game."""
+        # Generatore privato: le carte sono estratte a blocchi e servite una alla volta
+        self._seed(seed)
+
+        # Modello esatto su tutto lo spazio delle osservazioni, con
+        # s = (somma * 11 + carta del mazziere) * 2 + asso usabile
+        self._build_tables()
+
+    def _build_tables(self):
+        """
+        Precalcola il modello esatto dell'ambiente per ogni coppia (stato, azione).
+
+        Il modello riproduce step() così com'è: 'stick' termina sempre la partita,
+        mentre 'hit' termina con -1 se il giocatore sballa e altrimenti lascia lo
+        stato invariato (step restituisce self.state senza aggiornarlo).
+
+        Tabelle:
+            expected_reward[s, a]: ricompensa attesa.
+            done_prob[s, a]: probabilità che la partita termini.
+            transition_probs[s, a, s'] (su richiesta): probabilità di continuare in s'
+                (le righe sommano a 1 - done_prob[s, a]).
+            initial_distribution[s]: distribuzione dello stato restituito da reset().
+        """
+        sizes = [space.n for space in self.observation_space.spaces]
+        n_states = int(np.prod(sizes))
+        self.expected_reward = np.zeros((n_states, self.action_space.n))
+        self.done_prob = np.zeros((n_states, self.action_space.n))
+        for s in range(n_states):
+            player_sum, dealer_card, _ = self.decode(s)
+            # Hit: la somma sballa solo se supera 21 contando gli assi come 1
+            bust = sum(player_sum + card > 21 for card in self.deck) / len(self.deck)
+            self.expected_reward[s, 0] = -bust
+            self.done_prob[s, 0] = bust
+            # Stick: il mazziere gioca partendo dalla sola carta visibile
+            self.expected_reward[s, 1] = stick_reward(player_sum, dealer_card)
+            self.done_prob[s, 1] = 1.0
+
+        self.initial_distribution = np.zeros(n_states)
+        p = 1.0 / len(self.deck) ** 3
+        for first in self.deck:
+            for second in self.deck:
+                player_sum = first + second
+                usable_ace = int(1 in (first, second) and player_sum <= 11)
+                for dealer_card in self.deck:
+                    self.initial_distribution[self.encode((player_sum, dealer_card, usable_ace))] += p
+
+    @property
+    def transition_probs(self):
+        """Tensore denso transition_probs[s, a, s'] (costruito su richiesta)."""
+        n_states, n_actions = self.done_prob.shape
+        probs = np.zeros((n_states, n_actions, n_states))
+        states = np.arange(n_states)
+        # L'unica transizione non terminale è 'hit' senza sballare, che non cambia lo stato
+        probs[states, 0, states] = 1.0 - self.done_prob[:, 0]
+        return probs
+
+    def encode(self, state):
+        """Converte uno stato (somma, carta del mazziere, asso usabile) in un indice intero."""
+        player_sum, dealer_card, usable_ace = state
+        return (player_sum * 11 + dealer_card) * 2 + usable_ace
+
+    def decode(self, index):
+        """Converte un indice intero nello stato (somma, carta del mazziere, asso usabile)."""
+        rest, usable_ace = divmod(index, 2)
+        player_sum, dealer_card = divmod(rest, 11)
+        return player_sum, dealer_card, usable_ace
+
+    def _seed(self, seed):
+        self.rng = np.random.default_rng(seed)
+        self._cards = choice_buffer(self.rng, self.deck)
+
+    def reset(self, seed=None):
+        """
+        Reset the environment to start a new game.
+
+        Parameters:
+            seed (int, np.random.Generator or None): If given, re-seeds the card generator.
+        """
+        if seed is not None:
+            self._seed(seed)
         self.done = False
         player_hand = [self.draw_card(), self.draw_card()]
         dealer_hand = [self.draw_card(), self.draw_card()]
@@ -82,7 +209,7 @@ class Blackjack(gym.Env):
 
     def draw_card(self):
         """Estrai una carta dal mazzo."""
-        return random.choice(self.deck)
+        return self._cards.next()
 
     def render(self):
         """Render the current state of the environment."""
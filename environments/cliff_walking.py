@@ -2,11 +2,18 @@ import gym
 from gym import spaces
 import numpy as np
 
+from environments.grid_renderer import GridRenderer
+from environments.grid_tables import clipped_moves, scalar_lookups
+
 
 class CliffWalking(gym.Env):
-    def __init__(self):
+    def __init__(self, flat_obs=False):
         super(CliffWalking, self).__init__()
 
+        # Con flat_obs=True gli stati sono interi s = x * grid_width + y (coerenti con
+        # observation_space) invece di tuple (x, y).
+        self.flat_obs = flat_obs
+
         # Dimensione della griglia 12x4 (12 righe, 4 colonne)
         self.grid_height = 12
         self.grid_width = 4
@@ -25,57 +32,83 @@ class CliffWalking(gym.Env):
         # Posizione del cliff (il bordo tra start e goal)
         self.cliff = [(11, i) for i in range(1, 3)]
 
+        # Tabelle di transizione precalcolate: next_state[s, a], reward[s, a], done[s, a]
+        # con s = riga * grid_width + colonna. Sono pubbliche e utilizzabili dai planner.
+        self._build_tables()
+
+    def _build_tables(self):
+        """Precalcola movimento, cliff e ricompense per ogni coppia (stato, azione)."""
+        n_states = self.grid_height * self.grid_width
+        x, y = clipped_moves(self.grid_height, self.grid_width)
+        self.next_state = x * self.grid_width + y
+
+        # Maschere booleane per stato: pericoli (cliff) e stati terminali (cliff e goal)
+        self.hazard_mask = np.zeros(n_states, dtype=bool)
+        for cell in self.cliff:
+            self.hazard_mask[self.encode(cell)] = True
+        self.terminal_mask = self.hazard_mask.copy()
+        self.terminal_mask[self.encode(self.goal_position)] = True
+
+        in_cliff = self.hazard_mask[self.next_state]
+        at_goal = self.next_state == self.encode(self.goal_position)
+
+        # -100 se l'agente cade nel cliff, 0 al goal, -1 per ogni altro passo
+        self.reward = np.where(in_cliff, -100.0, -1.0)
+        self.reward[at_goal] = 0.0
+        self.done = in_cliff | at_goal
+        self._next, self._reward, self._done, self._coords = scalar_lookups(
+            self.next_state, self.reward, self.done, self.grid_width)
+        self._obs = range(n_states) if self.flat_obs else self._coords
+        self._renderer = None
+        self.state = self._obs[self.encode(self.start_position)]
+
     def reset(self):
         """Resetta l'ambiente"""
-        self.state = self.start_position
+        self.state = self._obs[self.encode(self.start_position)]
         return self.state  # Restituisce lo stato iniziale
 
+    def encode(self, state):
+        """Converte uno stato (x, y) nell'indice intero x * grid_width + y."""
+        x, y = state
+        return x * self.grid_width + y
+
+    def decode(self, index):
+        """Converte un indice intero nello stato (x, y)."""
+        return divmod(index, self.grid_width)
+
+    def _index(self, state):
+        # Indice intero dello stato, senza conversioni in modalità flat_obs
+        return state if self.flat_obs else state[0] * self.grid_width + state[1]
+
     def step(self, action):
         """Esegui un'azione nell'ambiente"""
-        x, y = self.state
-
-        # Mappatura delle azioni (0=UP, 1=DOWN, 2=LEFT, 3=RIGHT)
-        if action == 0:  # UP
-            x = max(0, x - 1)
-        elif action == 1:  # DOWN
-            x = min(self.grid_height - 1, x + 1)
-        elif action == 2:  # LEFT
-            y = max(0, y - 1)
-        elif action == 3:  # RIGHT
-            y = min(self.grid_width - 1, y + 1)
-
-        self.state = (x, y)
-
-        # Verifica se l'agente è caduto nel cliff
-        if self.state in self.cliff:
-            reward = -100
-            done = True
-        else:
-            reward = -1  # Penalità per ogni passo
-            done = False
-
-        # Verifica se siamo arrivati al goal
-        if self.state == self.goal_position:
-            reward = 0  # Ricompensa quando arriviamo al goal
-            done = True
-
-        return self.state, reward, done, False, {}
+        s = self._index(self.state)
+        self.state = self._obs[self._next[s][action]]
+        return self.state, self._reward[s][action], self._done[s][action], False, {}
+
+    def simulate_step(self, state, action):
+        """
+        Simula la transizione da uno stato dato senza modificare lo stato dell'ambiente.
+        """
+        s = self._index(state)
+        return self._obs[self._next[s][action]], self._reward[s][action], self._done[s][action], {}
+
+    @property
+    def renderer(self):
+        """GridRenderer con lo sfondo statico calcolato una sola volta (anche frame RGB)."""
+        if self._renderer is None:
+            self._renderer = self._make_renderer()
+        return self._renderer
+
+    def _make_renderer(self):
+        # 'G' rappresenta l'obiettivo e 'C' il cliff, entrambi disegnati sopra l'agente
+        goal = self.terminal_mask & ~self.hazard_mask
+        return GridRenderer(self.grid_height, self.grid_width,
+                            [("G", goal, True), ("C", self.hazard_mask, True)])
 
     def render(self):
         """Visualizza lo stato dell'ambiente"""
-        grid = np.zeros((self.grid_height, self.grid_width), dtype=str)
-        grid[:] = "."
-
-        x, y = self.state
-        grid[x, y] = "A"  # 'A' rappresenta l'agente
-        gx, gy = self.goal_position
-        grid[gx, gy] = "G"  # 'G' rappresenta l'obiettivo
-
-        # Mostra il cliff
-        for (cx, cy) in self.cliff:
-            grid[cx, cy] = "C"  # 'C' rappresenta il cliff
-
-        print("\n".join(" ".join(row) for row in grid))
+        print(self.renderer.ascii(self._index(self.state)))
         print()
 
     def close(self):
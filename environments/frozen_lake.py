@@ -1,16 +1,84 @@
 import gym
 from gym import spaces
 import numpy as np
-import random
+
+from environments.grid_renderer import GridRenderer
+from environments.grid_tables import ACTION_DELTAS, clipped_moves, scalar_lookups
+from environments.random_buffers import choice_buffer
+
+
+def reachable_cells(hole_mask, size, start=0):
+    """
+    Insieme delle celle raggiungibili da start senza attraversare fori (BFS).
+
+    La frontiera è un array di indici piatti espanso con operazioni NumPy, quindi il
+    costo è O(size * size) anche per laghi molto grandi.
+
+    Parameters:
+        hole_mask (np.ndarray): Maschera booleana piatta dei fori, lunghezza size * size.
+        size (int): Lato della griglia.
+        start (int): Indice piatto della cella di partenza.
+
+    Returns:
+        np.ndarray: Maschera booleana piatta delle celle raggiungibili.
+    """
+    reached = np.zeros(size * size, dtype=bool)
+    reached[start] = True
+    frontier = np.array([start])
+    while frontier.size:
+        x, y = np.divmod(frontier, size)
+        nx = (x[:, None] + ACTION_DELTAS[:, 0]).ravel()
+        ny = (y[:, None] + ACTION_DELTAS[:, 1]).ravel()
+        inside = (nx >= 0) & (nx < size) & (ny >= 0) & (ny < size)
+        neighbours = nx[inside] * size + ny[inside]
+        neighbours = np.unique(neighbours[~reached[neighbours] & ~hole_mask[neighbours]])
+        reached[neighbours] = True
+        frontier = neighbours
+    return reached
+
+
+def generate_lake(size, hole_density, rng=None, max_tries=100):
+    """
+    Genera casualmente un lago risolvibile di lato size.
+
+    Ogni cella (tranne partenza e goal) è un foro con probabilità hole_density; le
+    mappe in cui il goal non è raggiungibile dalla partenza vengono scartate.
+
+    Parameters:
+        size (int): Lato della griglia (es. 1024).
+        hole_density (float): Probabilità che una cella sia un foro.
+        rng (np.random.Generator or None): Generatore di numeri casuali.
+        max_tries (int): Numero massimo di mappe estratte prima di arrendersi.
+
+    Returns:
+        np.ndarray: Maschera dei fori compressa in bit (np.packbits della maschera piatta).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    goal = size * size - 1
+    for _ in range(max_tries):
+        holes = rng.random(size * size) < hole_density
+        holes[0] = holes[goal] = False
+        if reachable_cells(holes, size)[goal]:
+            return np.packbits(holes)
+    raise ValueError(f"No solvable {size}x{size} lake found with hole_density={hole_density} "
+                     f"in {max_tries} tries")
 
 
 class FrozenLake(gym.Env):
-    def __init__(self, size=4, slippery=False):
+    def __init__(self, size=4, slippery=False, flat_obs=False, hole_density=None, seed=None):
         super(FrozenLake, self).__init__()
 
+        # Con flat_obs=True gli stati sono interi s = x * grid_width + y (coerenti con
+        # observation_space) invece di tuple (x, y).
+        self.flat_obs = flat_obs
+
         self.size = size
         self.slippery = slippery
 
+        # Generatore privato (seed: intero, np.random.Generator o None): genera la mappa
+        # casuale e, sul ghiaccio, le azioni eseguite, estratte a blocchi
+        self.rng = np.random.default_rng(seed)
+
         # Dimensione della griglia (size x size)
         self.grid_height = size
         self.grid_width = size
@@ -26,67 +94,133 @@ class FrozenLake(gym.Env):
         self.goal_position = (size - 1, size - 1)
         self.state = self.start_position
 
-        # Definizione dei fori (terminal states)
-        self.holes = [(1, 2), (2, 1), (3, 3)]
-
-    def reset(self):
-        """Resetta l'ambiente"""
-        self.state = self.start_position
-        return self.state  # Restituisce lo stato iniziale
+        # Definizione dei fori (terminal states), memorizzati come maschera di bit:
+        # la mappa classica, oppure una mappa generata con densità hole_density
+        if hole_density is None:
+            hole_mask = np.zeros(size * size, dtype=bool)
+            for (hx, hy) in [(1, 2), (2, 1), (3, 3)]:
+                # Su griglie più piccole di 4x4 i fori fuori dalla griglia sono ignorati
+                if hx < size and hy < size:
+                    hole_mask[hx * size + hy] = True
+            self.hole_bits = np.packbits(hole_mask)
+        else:
+            self.hole_bits = generate_lake(size, hole_density, self.rng)
+
+        # Tabelle di transizione precalcolate: next_state[s, a], reward[s, a], done[s, a]
+        # con s = riga * grid_width + colonna, più la ricompensa attesa expected_reward[s, a]
+        # (diversa da reward solo se slippery) e transition_probs[s, a, s'] su richiesta.
+        self._build_tables()
+        self._slips = choice_buffer(self.rng, range(self.action_space.n))
+
+    @property
+    def holes(self):
+        """Elenco delle celle (x, y) con un foro, ricavato dalla maschera di bit."""
+        n_states = self.grid_height * self.grid_width
+        hole_mask = np.unpackbits(self.hole_bits, count=n_states).astype(bool)
+        return [self.decode(int(s)) for s in np.flatnonzero(hole_mask)]
+
+    def _build_tables(self):
+        """Precalcola movimento, fori e ricompense per ogni coppia (stato, azione)."""
+        n_states = self.grid_height * self.grid_width
+        n_actions = self.action_space.n
+        x, y = clipped_moves(self.grid_height, self.grid_width)
+        self.next_state = x * self.grid_width + y
+
+        # Maschere booleane per stato: pericoli (fori) e stati terminali (fori e goal)
+        self.hazard_mask = np.unpackbits(self.hole_bits, count=n_states).astype(bool)
+        self.terminal_mask = self.hazard_mask.copy()
+        self.terminal_mask[self.encode(self.goal_position)] = True
+
+        in_hole = self.hazard_mask[self.next_state]
+        at_goal = self.next_state == self.encode(self.goal_position)
+
+        # -100 se l'agente cade in un buco, 0 al goal, -1 per ogni altro passo
+        self.reward = np.where(in_hole, -100.0, -1.0)
+        self.reward[at_goal] = 0.0
+        self.done = in_hole | at_goal
 
-    def step(self, action):
-        """Esegui un'azione nell'ambiente"""
-        x, y = self.state
-
-        # Mappatura delle azioni (0=UP, 1=DOWN, 2=LEFT, 3=RIGHT)
-        if action == 0:  # UP
-            x = max(0, x - 1)
-        elif action == 1:  # DOWN
-            x = min(self.grid_height - 1, x + 1)
-        elif action == 2:  # LEFT
-            y = max(0, y - 1)
-        elif action == 3:  # RIGHT
-            y = min(self.grid_width - 1, y + 1)
-
-        # Applicazione del comportamento scivoloso (se abilitato)
         if self.slippery:
-            possible_actions = [0, 1, 2, 3]
-            random.shuffle(possible_actions)
-            action = possible_actions[0]
-            return self.step(action)
+            # Sul ghiaccio l'azione eseguita è uniforme: la stessa ricompensa attesa per ogni azione
+            self.expected_reward = np.repeat(self.reward.mean(axis=1, keepdims=True), n_actions, axis=1)
+        else:
+            self.expected_reward = self.reward.copy()
+        self._next, self._reward, self._done, self._coords = scalar_lookups(
+            self.next_state, self.reward, self.done, self.grid_width)
+        self._obs = range(n_states) if self.flat_obs else self._coords
+        self._renderer = None
+        self.state = self._obs[self.encode(self.start_position)]
+
+    @property
+    def transition_probs(self):
+        """
+        Tensore denso transition_probs[s, a, s'] (costruito su richiesta: solo per mappe piccole).
+        """
+        n_states = self.grid_height * self.grid_width
+        n_actions = self.action_space.n
+        one_hot = np.zeros((n_states, n_actions, n_states))
+        np.put_along_axis(one_hot, self.next_state[:, :, None], 1.0, axis=2)
+        if self.slippery:
+            return np.repeat(one_hot.mean(axis=1, keepdims=True), n_actions, axis=1)
+        return one_hot
+
+    def reset(self, seed=None):
+        """Resetta l'ambiente (con seed, reinizializza il generatore dello scivolamento)"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+            self._slips = choice_buffer(self.rng, range(self.action_space.n))
+        self.state = self._obs[self.encode(self.start_position)]
+        return self.state  # Restituisce lo stato iniziale
 
-        self.state = (x, y)
+    def encode(self, state):
+        """Converte uno stato (x, y) nell'indice intero x * grid_width + y."""
+        x, y = state
+        return x * self.grid_width + y
 
-        # Verifica se l'agente è caduto nel buco
-        if self.state in self.holes:
-            reward = -100
-            done = True
-        else:
-            reward = -1  # Penalità per ogni passo
-            done = False
+    def decode(self, index):
+        """Converte un indice intero nello stato (x, y)."""
+        return divmod(index, self.grid_width)
 
-        # Verifica se siamo arrivati al goal
-        if self.state == self.goal_position:
-            reward = 0  # Ricompensa quando arriviamo al goal
-            done = True
+    def _index(self, state):
+        # Indice intero dello stato, senza conversioni in modalità flat_obs
+        return state if self.flat_obs else state[0] * self.grid_width + state[1]
 
-        return self.state, reward, done, False, {}
+    def step(self, action):
+        """Esegui un'azione nell'ambiente"""
+        # Applicazione del comportamento scivoloso (se abilitato): l'azione eseguita
+        # è scelta uniformemente tra le quattro direzioni
+        if self.slippery:
+            action = self._slips.next()
+
+        s = self._index(self.state)
+        self.state = self._obs[self._next[s][action]]
+        return self.state, self._reward[s][action], self._done[s][action], False, {}
+
+    def simulate_step(self, state, action):
+        """
+        Simula la transizione deterministica di un'azione eseguita da uno stato dato,
+        senza modificare lo stato dell'ambiente (lo scivolamento non viene applicato:
+        usare transition_probs per il modello stocastico).
+        """
+        s = self._index(state)
+        return self._obs[self._next[s][action]], self._reward[s][action], self._done[s][action], {}
+
+    @property
+    def renderer(self):
+        """GridRenderer con lo sfondo statico calcolato una sola volta (anche frame RGB)."""
+        if self._renderer is None:
+            self._renderer = self._make_renderer()
+        return self._renderer
+
+    def _make_renderer(self):
+        # 'G' rappresenta l'obiettivo e 'H' i buchi, entrambi disegnati sopra l'agente
+        goal = np.zeros_like(self.terminal_mask)
+        goal[self.encode(self.goal_position)] = True
+        return GridRenderer(self.grid_height, self.grid_width,
+                            [("G", goal, True), ("H", self.hazard_mask, True)])
 
     def render(self):
         """Visualizza lo stato dell'ambiente"""
-        grid = np.zeros((self.grid_height, self.grid_width), dtype=str)
-        grid[:] = "."
-
-        x, y = self.state
-        grid[x, y] = "A"  # 'A' rappresenta l'agente
-        gx, gy = self.goal_position
-        grid[gx, gy] = "G"  # 'G' rappresenta l'obiettivo
-
-        # Mostra i fori
-        for (hx, hy) in self.holes:
-            grid[hx, hy] = "H"  # 'H' rappresenta il buco
-
-        print("\n".join(" ".join(row) for row in grid))
+        print(self.renderer.ascii(self._index(self.state)))
         print()
 
     def close(self):
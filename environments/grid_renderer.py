@@ -0,0 +1,108 @@
+import numpy as np
+from numpy.lib.format import open_memmap
+
+# Colore RGB di ogni simbolo
+PALETTE = {
+    ".": (235, 235, 235),  # cella libera
+    "A": (40, 90, 220),    # agente
+    "G": (40, 170, 70),    # goal
+    "T": (150, 150, 150),  # stato terminale
+    "H": (20, 30, 60),     # buco
+    "C": (140, 40, 30),    # cliff
+}
+
+
+class GridRenderer:
+    """
+    Renders a grid environment from a background computed once.
+
+    The static layer (goal, holes, cliff, terminal states) is turned into the ASCII
+    frame text and the RGB image at construction; drawing a state only patches the
+    agent cell. Layers marked as drawn above the agent hide it, as in the original
+    render methods (e.g. the agent on the goal prints "G").
+
+    States are flat indices s = row * cols + column.
+    """
+    def __init__(self, rows, cols, layers, cell_size=8):
+        """
+        Parameters:
+            rows (int), cols (int): Grid shape.
+            layers (list): (symbol, mask, above_agent) tuples drawn in order, where mask
+                           is a flat boolean array over the states.
+            cell_size (int): Side in pixels of one cell in RGB frames.
+        """
+        self.rows, self.cols = rows, cols
+        self.cell_size = cell_size
+        symbols = np.full(rows * cols, ".")
+        self.hides_agent = np.zeros(rows * cols, dtype=bool)
+        for symbol, mask, above_agent in layers:
+            symbols[mask] = symbol
+            self.hides_agent[mask] = above_agent
+        self.symbols = symbols.reshape(rows, cols)
+
+        # Testo del frame: ogni riga occupa 2 * cols caratteri ("x x x\n")
+        self.text = "\n".join(" ".join(row) for row in self.symbols)
+        colors = np.array([PALETTE[symbol] for symbol in self.symbols.ravel()], dtype=np.uint8)
+        self.background = np.repeat(np.repeat(colors.reshape(rows, cols, 3), cell_size, axis=0),
+                                    cell_size, axis=1)
+        self.agent_color = np.array(PALETTE["A"], dtype=np.uint8)
+
+    def ascii(self, state):
+        """ASCII frame of the grid with the agent in the flat state `state`."""
+        if self.hides_agent[state]:
+            return self.text
+        r, c = divmod(int(state), self.cols)
+        position = r * 2 * self.cols + 2 * c
+        return self.text[:position] + "A" + self.text[position + 1:]
+
+    def rgb(self, state):
+        """RGB frame, uint8 array of shape (rows * cell_size, cols * cell_size, 3)."""
+        return self.rgb_frames(np.array([state]))[0]
+
+    def rgb_frames(self, states):
+        """
+        RGB frames of a whole trajectory with one array operation.
+
+        Parameters:
+            states (np.ndarray): Flat states, shape (T,).
+
+        Returns:
+            np.ndarray: uint8 array of shape (T, rows * cell_size, cols * cell_size, 3).
+        """
+        states = np.asarray(states, dtype=np.int64)
+        frames = np.repeat(self.background[None], len(states), axis=0)
+        shown = np.flatnonzero(~self.hides_agent[states])
+        r, c = np.divmod(states[shown], self.cols)
+        offsets = np.arange(self.cell_size)
+        rows = (r * self.cell_size)[:, None, None] + offsets[None, :, None]
+        cols = (c * self.cell_size)[:, None, None] + offsets[None, None, :]
+        frames[shown[:, None, None], rows, cols] = self.agent_color
+        return frames
+
+    def export(self, path, states, mode="ascii", chunk_size=256):
+        """
+        Writes the frames of a trajectory to a single file.
+
+        mode="ascii" writes a text file with the frames separated by blank lines;
+        mode="rgb" writes a (T, H, W, 3) uint8 .npy file, filled chunk_size frames
+        at a time through a memmap so long trajectories never sit in memory at once.
+
+        Parameters:
+            path (str): Output file.
+            states (np.ndarray): Flat states of the trajectory, shape (T,).
+            mode (str): "ascii" or "rgb".
+            chunk_size (int): Frames rendered per batch in RGB mode.
+        """
+        states = np.asarray(states, dtype=np.int64)
+        if mode == "ascii":
+            with open(path, "w") as f:
+                f.write("\n\n".join(self.ascii(s) for s in states.tolist()))
+                f.write("\n")
+        elif mode == "rgb":
+            out = open_memmap(path, mode="w+", dtype=np.uint8,
+                              shape=(len(states),) + self.background.shape)
+            for start in range(0, len(states), chunk_size):
+                out[start:start + chunk_size] = self.rgb_frames(states[start:start + chunk_size])
+            out.flush()
+        else:
+            raise ValueError(f"Unknown mode {mode!r}: expected 'ascii' or 'rgb'")
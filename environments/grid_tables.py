@@ -0,0 +1,56 @@
+import numpy as np
+
+# Spostamento (riga, colonna) per ogni azione: 0=UP, 1=DOWN, 2=LEFT, 3=RIGHT
+ACTION_DELTAS = np.array([(-1, 0), (1, 0), (0, -1), (0, 1)])
+
+
+def clipped_moves(rows, cols):
+    """
+    Destination of every (state, action) pair on a rows x cols grid, clipped at the borders.
+
+    States are flattened row-major: s = row * cols + column.
+
+    Returns:
+        next_rows (np.ndarray), next_cols (np.ndarray): Arrays of shape (rows * cols, 4).
+    """
+    r, c = np.divmod(np.arange(rows * cols), cols)
+    next_rows = np.clip(r[:, None] + ACTION_DELTAS[:, 0], 0, rows - 1)
+    next_cols = np.clip(c[:, None] + ACTION_DELTAS[:, 1], 0, cols - 1)
+    return next_rows, next_cols
+
+
+# Above this many states the tables are not copied into Python lists (too slow and
+# memory hungry); the scalar step indexes the NumPy arrays directly instead.
+SCALAR_LIST_LIMIT = 1 << 16
+
+
+class _Coords:
+    """Read-only sequence of the (row, column) tuple of every state, computed on access."""
+    def __init__(self, n_states, cols):
+        self.n_states = n_states
+        self.cols = cols
+
+    def __len__(self):
+        return self.n_states
+
+    def __getitem__(self, s):
+        return divmod(int(s), self.cols)
+
+
+def scalar_lookups(next_state, reward, done, cols):
+    """
+    Python-list copies of the tables for the scalar step() hot path, where indexing
+    lists of Python objects is much cheaper than indexing NumPy arrays.
+
+    Large grids (more than SCALAR_LIST_LIMIT states) get the NumPy tables themselves
+    and a lazily computed coordinate sequence instead of lists.
+
+    Returns:
+        next_state, reward, done (indexable as table[s][a]) and the (row, column) tuple
+        of every state.
+    """
+    n_states = next_state.shape[0]
+    if n_states > SCALAR_LIST_LIMIT:
+        return next_state, reward.astype(int), done, _Coords(n_states, cols)
+    coords = [divmod(s, cols) for s in range(n_states)]
+    return (next_state.tolist(), reward.astype(int).tolist(), done.tolist(), coords)
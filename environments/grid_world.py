@@ -2,18 +2,30 @@ import gym
 from gym import spaces
 import numpy as np
 
+from environments.grid_renderer import GridRenderer
+from environments.grid_tables import clipped_moves, scalar_lookups
+
 class SimpleGridWorld(gym.Env):
     """
-    4x4 Grid World Environment:
+    Grid World Environment (4x4 by default, grid_size x grid_size in general):
       - State: represented by a pair (row, column)
-      - Terminal states: (0, 0) (top-left corner) and (3, 3) (bottom-right corner)
+      - Terminal states: (0, 0) (top-left corner) and (grid_size - 1, grid_size - 1)
+        (bottom-right corner)
       - Actions: 0=Up, 1=Down, 2=Left, 3=Right (deterministic movements)
       - Reward: -1 per step, 0 if a terminal state is reached
       - max_steps: maximum number of steps per episode
+
+    The dynamics are precomputed at construction as public tables next_state[s, a],
+    reward[s, a] and done[s, a] over flat states s = row * grid_size + column;
+    step and simulate_step are lookups into them.
+
+    With flat_obs=True, states are plain integers s (matching observation_space)
+    instead of (row, column) tuples; encode/decode convert between the two.
     """
-    def __init__(self, max_steps=100):
+    def __init__(self, max_steps=100, flat_obs=False, grid_size=4):
         super(SimpleGridWorld, self).__init__()
-        self.grid_size = 4  # 4x4 grid
+        self.flat_obs = flat_obs
+        self.grid_size = grid_size  # 4x4 grid by default
         self.action_space = spaces.Discrete(4)
         self.observation_space = spaces.Discrete(self.grid_size * self.grid_size)
         self.terminal_states = [(0, 0), (self.grid_size - 1, self.grid_size - 1)]
@@ -21,75 +33,83 @@ class SimpleGridWorld(gym.Env):
         self.state = self.start_state
         self.max_steps = max_steps
         self.current_step = 0
+        self._build_tables()
+
+    def _build_tables(self):
+        """Precomputes the transition, reward and termination tables."""
+        n_states = self.grid_size * self.grid_size
+        r, c = clipped_moves(self.grid_size, self.grid_size)
+        self.next_state = r * self.grid_size + c
+        # Boolean per-state masks: terminal states, and hazards (none in this world).
+        self.terminal_mask = np.zeros(n_states, dtype=bool)
+        for state in self.terminal_states:
+            self.terminal_mask[self.encode(state)] = True
+        self.hazard_mask = np.zeros(n_states, dtype=bool)
+        # Terminal states are absorbing: stay put with reward 0.
+        self.next_state[self.terminal_mask] = np.flatnonzero(self.terminal_mask)[:, None]
+        self.done = self.terminal_mask[self.next_state]
+        self.reward = np.where(self.done, 0.0, -1.0)
+        self._terminal = self.terminal_mask.tolist()
+        self._next, self._reward, self._done, self._coords = scalar_lookups(
+            self.next_state, self.reward, self.done, self.grid_size)
+        self._obs = range(n_states) if self.flat_obs else self._coords
+        self._renderer = None
+        self.state = self._obs[self.encode(self.start_state)]
 
     def reset(self):
         """Reset the environment to the start state."""
-        self.state = self.start_state
+        self.state = self._obs[self.encode(self.start_state)]
         self.current_step = 0
         return self.state
 
+    def encode(self, state):
+        """Maps a (row, column) state to its integer index row * grid_size + column."""
+        r, c = state
+        return r * self.grid_size + c
+
+    def decode(self, index):
+        """Maps an integer state index back to (row, column)."""
+        return divmod(index, self.grid_size)
+
+    def _index(self, state):
+        # Integer index of a state as stored in self.state (no conversion in flat_obs mode).
+        return state if self.flat_obs else state[0] * self.grid_size + state[1]
+
     def step(self, action):
         """
         Execute an action in the environment.
         If the state is terminal, return immediately.
         """
-        if self.state in self.terminal_states:
+        s = self._index(self.state)
+        if self._terminal[s]:
             return self.state, 0, True, {}
-        r, c = self.state
-        if action == 0:  # UP
-            r = max(0, r - 1)
-        elif action == 1:  # DOWN
-            r = min(self.grid_size - 1, r + 1)
-        elif action == 2:  # LEFT
-            c = max(0, c - 1)
-        elif action == 3:  # RIGHT
-            c = min(self.grid_size - 1, c + 1)
-        next_state = (r, c)
+        next_state = self._obs[self._next[s][action]]
         self.state = next_state
         self.current_step += 1
-        reward = -1
-        done = False
-        if next_state in self.terminal_states:
-            reward = 0
-            done = True
+        done = self._done[s][action]
         if self.current_step >= self.max_steps:
             done = True
-        return next_state, reward, done, {}
+        return next_state, self._reward[s][action], done, {}
 
     def simulate_step(self, state, action):
         """
         Helper method to simulate the transition from a given state and action
         without modifying the internal state of the environment.
         """
-        if state in self.terminal_states:
-            return state, 0, True, {}
-        r, c = state
-        if action == 0:  # UP
-            r = max(0, r - 1)
-        elif action == 1:  # DOWN
-            r = min(self.grid_size - 1, r + 1)
-        elif action == 2:  # LEFT
-            c = max(0, c - 1)
-        elif action == 3:  # RIGHT
-            c = min(self.grid_size - 1, c + 1)
-        next_state = (r, c)
-        reward = -1
-        done = next_state in self.terminal_states
-        if done:
-            reward = 0
-        return next_state, reward, done, {}
+        s = self._index(state)
+        return self._obs[self._next[s][action]], self._reward[s][action], self._done[s][action], {}
+
+    @property
+    def renderer(self):
+        """GridRenderer whose static layer (terminal states) is built once; also renders RGB frames."""
+        if self._renderer is None:
+            # Terminal states are drawn below the agent.
+            self._renderer = GridRenderer(self.grid_size, self.grid_size, [("T", self.terminal_mask, False)])
+        return self._renderer
 
     def render(self):
         """Display the grid with the agent and terminal states."""
-        grid = np.full((self.grid_size, self.grid_size), ".", dtype=str)
-        # Mark terminal states
-        for (r, c) in self.terminal_states:
-            grid[r, c] = "T"
-        # Mark the agent's current position
-        r, c = self.state
-        grid[r, c] = "A"
-        for row in grid:
-            print(" ".join(row))
+        print(self.renderer.ascii(self._index(self.state)))
         print()
 
     def close(self):
@@ -1,24 +1,64 @@
 import numpy as np
 
+
+class _NoiseTape:
+    """
+    Pre-generated N(0, 1) noise drawn in bulk from a Generator.
+
+    Rows of shape `row_shape` are handed out one at a time; when the tape is
+    exhausted a new block of `length` rows is drawn with a single call.
+    """
+    def __init__(self, rng, length, row_shape=()):
+        self.rng = rng
+        self.length = length
+        self.row_shape = row_shape
+        self.refill()
+
+    def refill(self):
+        self.values = self.rng.standard_normal((self.length,) + self.row_shape)
+        self.position = 0
+
+    def next(self):
+        if self.position == self.length:
+            self.refill()
+        row = self.values[self.position]
+        self.position += 1
+        return row
+
+
 class BanditEnvironment:
-    def __init__(self, k=10):
+    def __init__(self, k=10, rng=None, tape_length=1024, seed=None):
         """
         Initializes the multi-armed bandit environment.
 
         Parameters:
             k (int): Number of arms/actions available (default: 10).
+            rng (np.random.Generator or None): Private random number generator
+                                               (default: np.random.default_rng(seed)).
+            tape_length (int): If positive, reward noise is pre-generated in blocks of this
+                               many samples instead of one call per pull.
+            seed (int or None): Seed of the private generator when rng is not given.
         """
         self.k = k
+        self.tape_length = tape_length
+        self._seed(rng if rng is not None else seed)
         self.reset()  # Initialize true values and optimal action
 
-    def reset(self):
+    def _seed(self, seed):
+        self.rng = np.random.default_rng(seed)
+        self.noise_tape = _NoiseTape(self.rng, self.tape_length) if self.tape_length > 0 else None
+
+    def reset(self, seed=None):
         """
         Resets the environment by:
-        1. Generating new true reward values for each arm
-        2. Identifying the optimal arm (ground truth)
+        1. Re-seeding the private generator, if a seed is given
+        2. Generating new true reward values for each arm
+        3. Identifying the optimal arm (ground truth)
         """
+        if seed is not None:
+            self._seed(seed)
         # True expected rewards for each arm ~ Normal(μ=0, σ=1)
-        self.true_values = np.random.normal(0, 1, self.k)
+        self.true_values = self.rng.normal(0, 1, self.k)
 
         # Index of the arm with highest true reward (optimal action)
         self.optimal_action = np.argmax(self.true_values)
@@ -34,5 +74,63 @@ class BanditEnvironment:
             float: Sampled reward from Normal(μ=true_value_of_arm, σ=1)
         """
         # Reward = True value + Gaussian noise (σ=1 for exploration challenge)
-        reward = np.random.normal(self.true_values[action], 1)
-        return reward
\ No newline at end of file
+        if self.noise_tape is not None:
+            return self.true_values[action] + self.noise_tape.next()
+        return self.rng.normal(self.true_values[action], 1)
+
+
+class BatchedBanditEnvironment:
+    def __init__(self, num_instances, k=10, rng=None, tape_length=0, seed=None):
+        """
+        Initializes num_instances independent multi-armed bandit problems at once.
+
+        The true values are stored as a stacked (num_instances, k) matrix so that one
+        call to get_rewards serves a whole time step of every instance.
+
+        Parameters:
+            num_instances (int): Number of independent bandit problems.
+            k (int): Number of arms/actions available (default: 10).
+            rng (np.random.Generator or None): Private random number generator
+                                               (default: np.random.default_rng(seed)).
+            tape_length (int): If positive, reward noise for this many time steps is
+                               pre-generated in one bulk draw.
+            seed (int or None): Seed of the private generator when rng is not given.
+        """
+        self.num_instances = num_instances
+        self.k = k
+        self.tape_length = tape_length
+        self._seed(rng if rng is not None else seed)
+        self._rows = np.arange(num_instances)
+        self.reset()
+
+    def _seed(self, seed):
+        self.rng = np.random.default_rng(seed)
+        self.noise_tape = (_NoiseTape(self.rng, self.tape_length, (self.num_instances,))
+                           if self.tape_length > 0 else None)
+
+    def reset(self, seed=None):
+        """
+        Draws new true reward values for every instance and their optimal arms
+        (re-seeding the private generator first if a seed is given).
+        """
+        if seed is not None:
+            self._seed(seed)
+        self.true_values = self.rng.normal(0, 1, (self.num_instances, self.k))
+        self.optimal_action = np.argmax(self.true_values, axis=1)
+
+    def get_rewards(self, actions):
+        """
+        Pulls one arm in every bandit instance.
+
+        Parameters:
+            actions (np.ndarray): Integer array of shape (num_instances,) with the arm
+                                  chosen in each instance.
+
+        Returns:
+            np.ndarray: Rewards sampled from Normal(μ=true_value_of_arm, σ=1), one per instance.
+        """
+        if self.noise_tape is not None:
+            noise = self.noise_tape.next()
+        else:
+            noise = self.rng.standard_normal(self.num_instances)
+        return self.true_values[self._rows, actions] + noise
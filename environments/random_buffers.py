@@ -0,0 +1,47 @@
+import numpy as np
+
+# Numeri estratti per ogni ricarica del buffer
+BUFFER_SIZE = 4096
+
+
+class RandomBuffer:
+    """
+    Random numbers drawn in bulk and handed out one at a time as Python scalars.
+
+    sample(size) is called once per BUFFER_SIZE values (e.g. a bound method of an
+    np.random.Generator), so the per-step cost of a scalar environment is a list
+    iteration instead of a call into the random generator.
+    """
+    def __init__(self, sample, size=BUFFER_SIZE):
+        """
+        Parameters:
+            sample (callable): sample(size) returns a NumPy array of size random values.
+            size (int): Number of values drawn per refill.
+        """
+        self.sample = sample
+        self.size = size
+        self.refill()
+
+    def refill(self):
+        """Discards the remaining values and draws a new block."""
+        self._values = iter(self.sample(self.size).tolist())
+
+    def next(self):
+        try:
+            return next(self._values)
+        except StopIteration:
+            self.refill()
+            return next(self._values)
+
+
+def choice_buffer(rng, values, size=BUFFER_SIZE):
+    """
+    RandomBuffer of uniform draws from values.
+
+    Parameters:
+        rng (np.random.Generator): Source of randomness.
+        values (sequence): Values to draw from (e.g. a deck of cards).
+        size (int): Number of values drawn per refill.
+    """
+    values = np.asarray(values)
+    return RandomBuffer(lambda n: values[rng.integers(0, len(values), n)], size)
@@ -0,0 +1,171 @@
+"""
+Batched action-selection kernels for k-armed bandit policies.
+
+Every kernel works on (batch, k) arrays, one row per independent bandit problem,
+and returns an integer array of shape (batch,) with the chosen arm of each row.
+A single problem is handled by passing Q[None] and taking element [0].
+"""
+import numpy as np
+
+
+def greedy(Q, rng):
+    """
+    Greedy selection with ties broken uniformly at random.
+
+    Parameters:
+        Q (np.ndarray): Estimated action values, shape (batch, k).
+        rng (np.random.Generator): Random number generator.
+
+    Returns:
+        np.ndarray: Chosen arm of each row.
+    """
+    is_max = Q == Q.max(axis=1, keepdims=True)
+    # Random scores masked to the maximal arms: the argmax is a uniform pick among ties.
+    return np.argmax(rng.random(Q.shape) * is_max, axis=1)
+
+
+def epsilon_greedy(Q, epsilon, rng):
+    """
+    Epsilon-greedy selection with random tie-breaking.
+
+    Parameters:
+        Q (np.ndarray): Estimated action values, shape (batch, k).
+        epsilon (float): Probability of selecting a uniformly random arm.
+        rng (np.random.Generator): Random number generator.
+
+    Returns:
+        np.ndarray: Chosen arm of each row.
+    """
+    batch, k = Q.shape
+    actions = greedy(Q, rng)
+    explore = rng.random(batch) < epsilon
+    actions[explore] = rng.integers(0, k, np.count_nonzero(explore))
+    return actions
+
+
+def ucb1(Q, counts, t, c):
+    """
+    Upper Confidence Bound selection: argmax_a Q(a) + c * sqrt(ln(t+1) / N(a)).
+
+    Arms that were never selected have an infinite bound, so they are tried first
+    (in index order, as in run_experiment_ucb).
+
+    Parameters:
+        Q (np.ndarray): Estimated action values, shape (batch, k).
+        counts (np.ndarray): Number of times each arm was selected, shape (batch, k).
+        t (int): Current time step (starting at 0).
+        c (float): Exploration parameter.
+
+    Returns:
+        np.ndarray: Chosen arm of each row.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bonus = c * np.sqrt(np.log(t + 1) / counts)
+    bonus[counts == 0] = np.inf
+    return np.argmax(Q + bonus, axis=1)
+
+
+def log_softmax(preferences, tau=1.0):
+    """
+    Numerically stable log-probabilities of the Boltzmann distribution over arms.
+
+    Uses the log-sum-exp trick, so tiny temperatures (e.g. tau=0.01) do not overflow.
+
+    Parameters:
+        preferences (np.ndarray): Action values or preferences, shape (batch, k).
+        tau (float): Temperature.
+
+    Returns:
+        np.ndarray: log P(a) for every arm, shape (batch, k).
+    """
+    scaled = preferences / tau
+    shifted = scaled - scaled.max(axis=1, keepdims=True)
+    return shifted - np.log(np.exp(shifted).sum(axis=1, keepdims=True))
+
+
+def softmax_probabilities(preferences, tau=1.0):
+    """
+    Boltzmann probabilities P(a) = exp(Q(a)/tau) / sum_i exp(Q(i)/tau), computed stably.
+
+    Parameters:
+        preferences (np.ndarray): Action values or preferences, shape (batch, k).
+        tau (float): Temperature.
+
+    Returns:
+        np.ndarray: Probabilities, shape (batch, k); every row sums to 1.
+    """
+    return np.exp(log_softmax(preferences, tau))
+
+
+def softmax(Q, tau, rng):
+    """
+    Softmax (Boltzmann) selection via the Gumbel-max trick.
+
+    argmax_a (Q(a)/tau + G(a)) with G(a) ~ Gumbel(0, 1) is distributed exactly as the
+    softmax over Q/tau, and never exponentiates Q/tau.
+
+    Parameters:
+        Q (np.ndarray): Estimated action values, shape (batch, k).
+        tau (float): Temperature; low values are nearly greedy, high values nearly uniform.
+        rng (np.random.Generator): Random number generator.
+
+    Returns:
+        np.ndarray: Chosen arm of each row.
+    """
+    return np.argmax(Q / tau + rng.gumbel(size=Q.shape), axis=1)
+
+
+def gradient_bandit(H, rng):
+    """
+    Gradient-bandit selection: samples arms from the softmax of the preferences H.
+
+    Parameters:
+        H (np.ndarray): Action preferences, shape (batch, k).
+        rng (np.random.Generator): Random number generator.
+
+    Returns:
+        np.ndarray: Chosen arm of each row.
+    """
+    return softmax(H, 1.0, rng)
+
+
+def gradient_bandit_update(H, actions, rewards, baseline, alpha):
+    """
+    Stochastic gradient-ascent update of the preferences, in place:
+
+        H(A) += alpha * (R - baseline) * (1 - pi(A))
+        H(a) -= alpha * (R - baseline) * pi(a)      for a != A
+
+    Parameters:
+        H (np.ndarray): Action preferences, shape (batch, k); modified in place.
+        actions (np.ndarray): Arms that were chosen, shape (batch,).
+        rewards (np.ndarray): Rewards received, shape (batch,).
+        baseline (np.ndarray): Reward baseline of each row (e.g. the average reward so far).
+        alpha (float): Step size.
+    """
+    pi = softmax_probabilities(H)
+    step = alpha * (rewards - baseline)
+    H -= step[:, None] * pi
+    H[np.arange(len(actions)), actions] += step
+
+
+def thompson_sampling(Q, counts, rng, prior_std=1.0):
+    """
+    Thompson sampling for Gaussian rewards with unit noise and a N(0, prior_std^2) prior.
+
+    The posterior of each arm is Gaussian with precision 1/prior_std^2 + N(a) and
+    mean N(a) * Q(a) / precision; one sample is drawn per arm and the best is chosen.
+
+    Parameters:
+        Q (np.ndarray): Sample-average action values, shape (batch, k).
+        counts (np.ndarray): Number of times each arm was selected, shape (batch, k).
+        rng (np.random.Generator): Random number generator.
+        prior_std (float): Standard deviation of the prior over true values.
+
+    Returns:
+        np.ndarray: Chosen arm of each row.
+    """
+    precision = 1.0 / prior_std ** 2 + counts
+    posterior_mean = counts * Q / precision
+    samples = posterior_mean + rng.standard_normal(Q.shape) / np.sqrt(precision)
+    return np.argmax(samples, axis=1)
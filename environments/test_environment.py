@@ -6,7 +6,11 @@ from environments.windy_grid_world import WindyGridWorld
 from environments.cliff_walking import CliffWalking
 from environments.frozen_lake import FrozenLake
 from environments.blackjack import Blackjack
+from environments.grid_world import SimpleGridWorld
+from environments.vector_blackjack import VectorBlackjack
+from environments.vector_grid import VectorGridEnv
 from environments.multibandit_problem import BanditEnvironment
+from environments import selection_kernels
 
 
 def test_windy_grid_world():
@@ -49,6 +53,22 @@ def test_frozen_lake():
     print("FrozenLake test completed.\n")
 
 
+def test_frozen_lake_small():
+    print("Testing FrozenLake on grids smaller than the classic map...")
+    for size in (2, 3):
+        env = FrozenLake(size=size)
+        # Restano solo i fori della mappa classica che cadono nella griglia
+        expected = [(hx, hy) for (hx, hy) in [(1, 2), (2, 1), (3, 3)] if hx < size and hy < size]
+        assert env.holes == expected
+        state, _ = env.reset()
+        done = False
+        while not done:
+            state, reward, done, truncated, info = env.step(env.action_space.sample())
+            done = done or truncated
+        print(f"size={size}: holes {env.holes}, final state {state}")
+    print("Small FrozenLake test completed.\n")
+
+
 def test_blackjack():
     print("Testing Blackjack environment...")
     env = Blackjack()
@@ -75,7 +95,8 @@ def test_multi_bandit():
         campionato normalmente attorno al valore vero.
     """
     print("Testing Multi-Armed Bandit environment...")
-    env = BanditEnvironment(k=10)
+    rng = np.random.default_rng()
+    env = BanditEnvironment(k=10, rng=rng)
     total_steps = 1000
     epsilon = 0.1  # Parametro epsilon della politica epsilon-greedy
     Q = np.zeros(env.k)  # Stima dei valori per ogni braccio
@@ -88,12 +109,7 @@ def test_multi_bandit():
 
     for step in range(total_steps):
         # Selezione dell'azione con epsilon-greedy
-        if np.random.rand() < epsilon:
-            action = np.random.randint(0, env.k)
-        else:
-            max_val = np.max(Q)
-            candidates = np.where(Q == max_val)[0]
-            action = np.random.choice(candidates)
+        action = int(selection_kernels.epsilon_greedy(Q[None], epsilon, rng)[0])
 
         # Otteniamo il reward per l'azione scelta
         reward = env.get_reward(action)
@@ -115,13 +131,46 @@ def test_multi_bandit():
     print("Multi-Armed Bandit test completed.\n")
 
 
+def test_vector_grid_envs():
+    print("Testing VectorGridEnv on every grid environment...")
+    for env in [WindyGridWorld(), CliffWalking(), FrozenLake(), SimpleGridWorld()]:
+        num_envs = 8
+        vec_env = VectorGridEnv(env, num_envs, max_steps=50, seed=0)
+        obs = vec_env.reset()
+        for _ in range(100):
+            # Azioni casuali per tutte le copie in un'unica chiamata
+            actions = np.random.randint(0, env.action_space.n, num_envs)
+            obs, reward, terminated, truncated, info = vec_env.step(actions)
+            assert obs.shape == reward.shape == terminated.shape == truncated.shape == (num_envs,)
+        print(f"{type(env).__name__}: last observations {obs}")
+    print("VectorGridEnv test completed.\n")
+
+
+def test_vector_blackjack():
+    print("Testing VectorBlackjack environment...")
+    num_envs = 1000
+    env = VectorBlackjack(num_envs, seed=0)
+    obs = env.reset()
+    total_reward = np.zeros(num_envs)
+    while not env.done.all():
+        # Azioni casuali (0 = hit, 1 = stick) per tutte le mani
+        actions = np.random.randint(0, 2, num_envs)
+        obs, reward, done, _ = env.step(actions)
+        total_reward += reward
+    print(f"Average reward over {num_envs} hands: {total_reward.mean():.3f}")
+    print("VectorBlackjack test completed.\n")
+
+
 def main():
     # Eseguiamo tutti i test degli ambienti
     test_windy_grid_world()
     test_cliff_walking()
     test_frozen_lake()
+    test_frozen_lake_small()
     test_blackjack()
     test_multi_bandit()
+    test_vector_grid_envs()
+    test_vector_blackjack()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,243 @@
+import json
+import os
+import struct
+
+import numpy as np
+from numpy.lib import format as npy_format
+from numpy.lib.format import open_memmap
+
+COLUMNS = ("states", "actions", "rewards", "dones")
+META_FILE = "meta.json"
+
+
+class _GrowableColumn:
+    """
+    A .npy file opened as a writable memmap whose capacity doubles when full.
+
+    Only the first `length` rows are valid; the rest is preallocated space. Growing
+    copies the data once into a file twice as large, so appends are amortised O(1).
+    close() truncates the file to the valid rows, so np.load reads exactly those.
+    """
+    def __init__(self, path, dtype, row_shape=(), capacity=1024):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.row_shape = tuple(row_shape)
+        self.length = 0
+        self.array = open_memmap(path, mode="w+", dtype=self.dtype, shape=(capacity,) + self.row_shape)
+
+    def _grow(self, min_capacity):
+        capacity = len(self.array)
+        while capacity < min_capacity:
+            capacity *= 2
+        tmp_path = self.path + ".tmp"
+        grown = open_memmap(tmp_path, mode="w+", dtype=self.dtype, shape=(capacity,) + self.row_shape)
+        grown[:self.length] = self.array[:self.length]
+        grown.flush()
+        # Both files are unmapped before the rename (a mapped file cannot be replaced
+        # on Windows), then the grown one is mapped again
+        del grown
+        self.array = None
+        os.replace(tmp_path, self.path)
+        self.array = open_memmap(self.path, mode="r+")
+
+    def extend(self, rows):
+        """Appends rows (array of shape (n,) + row_shape)."""
+        rows = np.asarray(rows, dtype=self.dtype)
+        end = self.length + len(rows)
+        if end > len(self.array):
+            self._grow(end)
+        self.array[self.length:end] = rows
+        self.length = end
+
+    def flush(self):
+        self.array.flush()
+
+    def close(self):
+        """
+        Unmaps the file and truncates it to the valid rows.
+
+        The header is rewritten in place with shape (length,) + row_shape: it is padded
+        to its original size, so the data does not move.
+        """
+        self.array.flush()
+        self.array = None
+        with open(self.path, "r+b") as f:
+            version = npy_format.read_magic(f)
+            if version == (1, 0):
+                npy_format.read_array_header_1_0(f)
+            else:
+                npy_format.read_array_header_2_0(f)
+            offset = f.tell()
+            header = repr({"descr": npy_format.dtype_to_descr(self.dtype), "fortran_order": False,
+                           "shape": (self.length,) + self.row_shape}).encode("latin1")
+            size_format = "<H" if version == (1, 0) else "<I"
+            header_size = offset - npy_format.MAGIC_LEN - struct.calcsize(size_format)
+            f.seek(0)
+            f.write(npy_format.magic(*version) + struct.pack(size_format, header_size)
+                    + header.ljust(header_size - 1) + b"\n")
+            f.truncate(offset + self.length * self.dtype.itemsize * int(np.prod(self.row_shape)))
+
+
+class EpisodeWriter:
+    """
+    Appends episodes to a directory of columnar .npy files.
+
+    Layout:
+        states.npy, actions.npy, rewards.npy, dones.npy  one row per transition
+        episode_offsets.npy                              start of every episode, plus the end
+        meta.json                                        valid lengths of the files above
+
+    The .npy files are preallocated and grown by doubling while writing; close()
+    truncates them to the valid rows, so they can also be read with np.load.
+    Transitions of the current episode are buffered in memory until end_episode().
+    """
+    def __init__(self, directory, state_shape=(), state_dtype=np.int64, capacity=1024):
+        """
+        Parameters:
+            directory (str): Output directory (created if missing, existing files overwritten).
+            state_shape (tuple): Shape of one recorded state (() for integer states).
+            state_dtype (np.dtype): dtype of the recorded states.
+            capacity (int): Initial number of rows allocated per column.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        dtypes = {"states": state_dtype, "actions": np.int64, "rewards": np.float64, "dones": bool}
+        self.columns = {
+            name: _GrowableColumn(os.path.join(directory, f"{name}.npy"), dtypes[name],
+                                  state_shape if name == "states" else (), capacity)
+            for name in COLUMNS
+        }
+        self.offsets = _GrowableColumn(os.path.join(directory, "episode_offsets.npy"), np.int64)
+        self.offsets.extend([0])
+        self._pending = {name: [] for name in COLUMNS}
+
+    @property
+    def num_episodes(self):
+        return self.offsets.length - 1
+
+    def append(self, state, action, reward, done):
+        """Buffers one transition of the current episode."""
+        for name, value in zip(COLUMNS, (state, action, reward, done)):
+            self._pending[name].append(value)
+
+    def end_episode(self):
+        """Writes the buffered transitions as one episode (no-op if nothing was buffered)."""
+        if not self._pending["actions"]:
+            return
+        for name in COLUMNS:
+            self.columns[name].extend(self._pending[name])
+            self._pending[name].clear()
+        self.offsets.extend([self.columns["actions"].length])
+
+    def close(self):
+        """Truncates every column to its valid rows and writes meta.json; an unfinished episode is discarded."""
+        for column in list(self.columns.values()) + [self.offsets]:
+            column.close()
+        meta = {
+            "transitions": self.columns["actions"].length,
+            "episodes": self.num_episodes,
+            "state_shape": list(self.columns["states"].row_shape),
+        }
+        with open(os.path.join(self.directory, META_FILE), "w") as f:
+            json.dump(meta, f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EpisodeStore:
+    """
+    Read-only, memory-mapped view of a directory written by EpisodeWriter.
+
+    Columns are np.memmap slices, so nothing is loaded into RAM until it is read and
+    datasets larger than memory can be streamed episode by episode. store[i] returns
+    the columns of episode i as zero-copy views.
+    """
+    def __init__(self, directory):
+        with open(os.path.join(directory, META_FILE)) as f:
+            meta = json.load(f)
+        self.directory = directory
+        self.num_transitions = meta["transitions"]
+        self.offsets = np.load(os.path.join(directory, "episode_offsets.npy"),
+                               mmap_mode="r")[:meta["episodes"] + 1]
+        for name in COLUMNS:
+            column = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+            setattr(self, name, column[:self.num_transitions])
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        """Returns the episode i as a dict of column views."""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"episode {i} out of range for a store of {len(self)} episodes")
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return {name: getattr(self, name)[start:end] for name in COLUMNS}
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def episode_lengths(self):
+        return np.diff(self.offsets)
+
+    def sample(self, rng, size=None):
+        """Indices of episodes drawn uniformly at random (with replacement)."""
+        return rng.integers(0, len(self), size)
+
+
+class TrajectoryRecorder:
+    """
+    Wraps any environment and records every (state, action, reward, done) it produces.
+
+    The state stored for a transition is the one the action was taken from. States
+    are stored as integer indices via env.encode when the environment has one and
+    its states are tuples (grid worlds, Blackjack); otherwise they are stored as
+    arrays. An episode ends when step reports done (or truncated), or when reset is
+    called in the middle of one. step/reset return exactly what the wrapped
+    environment returns; other attributes are forwarded to it.
+    """
+    def __init__(self, env, writer):
+        """
+        Parameters:
+            env (gym.Env): Environment to record.
+            writer (EpisodeWriter): Destination of the transitions.
+        """
+        self.env = env
+        self.writer = writer
+        self._state = None
+
+    def __getattr__(self, name):
+        return getattr(self.env, name)
+
+    def _key(self, state):
+        if isinstance(state, tuple) and hasattr(self.env, "encode"):
+            return self.env.encode(state)
+        return state
+
+    def reset(self, *args, **kwargs):
+        self.writer.end_episode()
+        state = self.env.reset(*args, **kwargs)
+        self._state = self._key(state)
+        return state
+
+    def step(self, action):
+        result = self.env.step(action)
+        next_state, reward, done = result[0], result[1], result[2]
+        # Le API a 5 elementi segnalano anche truncated
+        if len(result) == 5:
+            done = done or result[3]
+        self.writer.append(self._state, action, reward, done)
+        self._state = self._key(next_state)
+        if done:
+            self.writer.end_episode()
+        return result
+
+    def close(self):
+        self.writer.close()
+        self.env.close()
@@ -0,0 +1,92 @@
+import numpy as np
+
+# Mazzo infinito, come in Blackjack.deck (assi contati come 1)
+DECK = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10])
+
+
+class VectorBlackjack:
+    """
+    Batched Blackjack simulator: num_envs independent hands advanced together.
+
+    Cards for all hands are dealt at once from a NumPy Generator and the dealer
+    plays every sticking hand with masked array operations. reset/step follow the
+    scalar Blackjack environment exactly, including its conventions: the dealer
+    starts from the face-up card only, a hit that does not bust returns the
+    observation from before the hit, and finished hands keep returning reward 0
+    until the next reset.
+
+    Observations are int arrays of shape (num_envs, 3) with columns
+    (player_sum, dealer_card, usable_ace).
+    """
+    def __init__(self, num_envs, seed=None):
+        """
+        Parameters:
+            num_envs (int): Number of hands played in parallel.
+            seed (int, np.random.Generator or None): Seed or generator for dealing cards.
+        """
+        self.num_envs = num_envs
+        self.rng = np.random.default_rng(seed)
+        self.state = np.zeros((num_envs, 3), dtype=np.int64)
+        self.done = np.ones(num_envs, dtype=bool)
+
+    def draw_cards(self, shape):
+        """Deals cards from the infinite deck."""
+        return DECK[self.rng.integers(0, len(DECK), shape)]
+
+    def reset(self):
+        """Deals a new hand everywhere and returns the initial observations."""
+        player_hand = self.draw_cards((self.num_envs, 2))
+        dealer_card = self.draw_cards(self.num_envs)
+        player_sum = player_hand.sum(axis=1)
+        usable_ace = ((player_hand == 1).any(axis=1) & (player_sum <= 11)).astype(np.int64)
+        self.state = np.stack([player_sum, dealer_card, usable_ace], axis=1)
+        self.done = np.zeros(self.num_envs, dtype=bool)
+        return self.state.copy()
+
+    def _dealer_sums(self, dealer_card):
+        """Plays the dealer for every hand at once: draw until the sum reaches 17."""
+        dealer_sum = dealer_card.copy()
+        drawing = dealer_sum < 17
+        while drawing.any():
+            dealer_sum[drawing] += self.draw_cards(np.count_nonzero(drawing))
+            drawing = dealer_sum < 17
+        return dealer_sum
+
+    def step(self, actions):
+        """
+        Takes one action per hand (0 = 'hit', 1 = 'stick').
+
+        Parameters:
+            actions (np.ndarray): Integer array of shape (num_envs,).
+
+        Returns:
+            obs (np.ndarray): Observations, shape (num_envs, 3).
+            reward (np.ndarray): Rewards (+1 win, -1 loss, 0 draw or game still running).
+            done (np.ndarray): True where the hand is over.
+            info (dict): Empty, for compatibility with the scalar step.
+        """
+        actions = np.asarray(actions)
+        player_sum, dealer_card, usable_ace = self.state.T
+        active = ~self.done
+        obs = self.state.copy()
+        reward = np.zeros(self.num_envs)
+
+        # Hit: one card for every hitting hand; a usable ace counts 11 while the sum is <= 11.
+        hitting = np.flatnonzero(active & (actions == 0))
+        new_sum = player_sum[hitting] + self.draw_cards(len(hitting))
+        new_sum += 10 * ((usable_ace[hitting] == 1) & (new_sum <= 11))
+        bust = hitting[new_sum > 21]
+        obs[bust, 0] = new_sum[new_sum > 21]
+        reward[bust] = -1
+        self.done[bust] = True
+
+        # Stick: the dealer plays, then the sums are compared.
+        sticking = np.flatnonzero(active & (actions == 1))
+        dealer_sum = self._dealer_sums(dealer_card[sticking])
+        player = player_sum[sticking]
+        reward[sticking] = np.where((dealer_sum > 21) | (dealer_sum < player), 1,
+                                    np.where(dealer_sum > player, -1, 0))
+        self.done[sticking] = True
+
+        # The scalar environment returns the bust observation but keeps its old state.
+        return obs, reward, self.done.copy(), {}
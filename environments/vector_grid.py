@@ -0,0 +1,90 @@
+import numpy as np
+
+
+def grid_shape(env):
+    """Returns (rows, columns) of a grid environment."""
+    if hasattr(env, "grid_height"):
+        return env.grid_height, env.grid_width
+    return env.grid_size, env.grid_size
+
+
+class VectorGridEnv:
+    """
+    N copies of a grid environment stepped together with NumPy.
+
+    The copies are held as an integer array of flat states (row * columns + column);
+    one call to step advances all of them with lookups into the environment's
+    precomputed next_state / reward / done tables. Copies that terminate
+    or hit max_steps are reset automatically, and their last observation is returned
+    in info["final_observation"].
+
+    Works with SimpleGridWorld, WindyGridWorld, CliffWalking and FrozenLake.
+    """
+    def __init__(self, env, num_envs, max_steps=None, seed=None):
+        """
+        Parameters:
+            env (gym.Env): Scalar grid environment to replicate.
+            num_envs (int): Number of copies.
+            max_steps (int or None): Episode length limit (default: env.max_steps if defined).
+            seed (int or None): Seed of the generator used for slippery transitions.
+        """
+        self.env = env
+        self.num_envs = num_envs
+        self.rows, self.cols = grid_shape(env)
+        self.n_actions = env.action_space.n
+        self.next_state, self.reward, self.done = env.next_state, env.reward, env.done
+        start = env.reset()
+        self.start_state = start if getattr(env, "flat_obs", False) else env.encode(start)
+        self.slippery = getattr(env, "slippery", False)
+        self.max_steps = max_steps if max_steps is not None else getattr(env, "max_steps", None)
+        self.rng = np.random.default_rng(seed)
+        self.states = np.full(num_envs, self.start_state, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+
+    def encode(self, state):
+        """(row, column) -> flat state index."""
+        r, c = state
+        return r * self.cols + c
+
+    def decode(self, index):
+        """Flat state index -> (row, column); works element-wise on arrays."""
+        return np.divmod(index, self.cols)
+
+    def reset(self):
+        """Resets every copy and returns the initial observations."""
+        self.states[:] = self.start_state
+        self.steps[:] = 0
+        return self.states.copy()
+
+    def step(self, actions):
+        """
+        Takes one action in every copy.
+
+        Parameters:
+            actions (np.ndarray): Integer array of shape (num_envs,).
+
+        Returns:
+            obs (np.ndarray): Next flat states (start state for copies that were reset).
+            reward (np.ndarray): Rewards.
+            terminated (np.ndarray): True where the copy reached a terminal state.
+            truncated (np.ndarray): True where the copy hit max_steps without terminating.
+            info (dict): "final_observation" holds the next states before auto-reset.
+        """
+        if self.slippery:
+            # Slippery ice: the executed action is uniformly random, as in FrozenLake.
+            actions = self.rng.integers(0, self.n_actions, self.num_envs)
+        next_states = self.next_state[self.states, actions]
+        reward = self.reward[self.states, actions]
+        terminated = self.done[self.states, actions]
+
+        self.steps += 1
+        if self.max_steps is not None:
+            truncated = ~terminated & (self.steps >= self.max_steps)
+        else:
+            truncated = np.zeros(self.num_envs, dtype=bool)
+
+        info = {"final_observation": next_states}
+        finished = terminated | truncated
+        self.states = np.where(finished, self.start_state, next_states)
+        self.steps[finished] = 0
+        return self.states.copy(), reward, terminated, truncated, info
@@ -2,11 +2,18 @@ import gym
 from gym import spaces
 import numpy as np
 
+from environments.grid_renderer import GridRenderer
+from environments.grid_tables import clipped_moves, scalar_lookups
+
 
 class WindyGridWorld(gym.Env):
-    def __init__(self):
+    def __init__(self, flat_obs=False):
         super(WindyGridWorld, self).__init__()
 
+        # Con flat_obs=True gli stati sono interi s = x * grid_width + y (coerenti con
+        # observation_space) invece di tuple (x, y).
+        self.flat_obs = flat_obs
+
         # Dimensione della griglia 10x7 (10 righe, 7 colonne)
         self.grid_height = 10
         self.grid_width = 7
@@ -25,50 +32,80 @@ class WindyGridWorld(gym.Env):
         # Mappa del vento
         self.wind_map = [0, 0, 0, 1, 1, 2, 2, 1]  # La quantità di vento per ogni colonna
 
+        # Tabelle di transizione precalcolate: next_state[s, a], reward[s, a], done[s, a]
+        # con s = riga * grid_width + colonna. Sono pubbliche e utilizzabili dai planner.
+        self._build_tables()
+
+    def _build_tables(self):
+        """Precalcola movimento, vento e ricompense per ogni coppia (stato, azione)."""
+        n_states = self.grid_height * self.grid_width
+        x, y = clipped_moves(self.grid_height, self.grid_width)
+
+        # Gestione del vento: le righe 3, 4 e 5 sono ventose
+        wind = np.asarray(self.wind_map)[y]
+        windy = (x >= 3) & (x <= 5)
+        x = np.where(windy, np.maximum(0, x - wind), x)
+
+        self.next_state = x * self.grid_width + y
+
+        # Maschere booleane per stato: terminali (solo il goal) e pericoli (nessuno)
+        self.terminal_mask = np.zeros(n_states, dtype=bool)
+        self.terminal_mask[self.encode(self.goal_position)] = True
+        self.hazard_mask = np.zeros(n_states, dtype=bool)
+
+        self.done = self.terminal_mask[self.next_state]
+        self.reward = np.where(self.done, 0.0, -1.0)  # -1 per ogni passo, 0 al goal
+        self._next, self._reward, self._done, self._coords = scalar_lookups(
+            self.next_state, self.reward, self.done, self.grid_width)
+        self._obs = range(n_states) if self.flat_obs else self._coords
+        self._renderer = None
+        self.state = self._obs[self.encode(self.start_position)]
+
     def reset(self):
         """Resetta l'ambiente"""
-        self.state = self.start_position
+        self.state = self._obs[self.encode(self.start_position)]
         return self.state  # Restituisce lo stato iniziale
 
-    def step(self, action):
-        """Esegui un'azione nell'ambiente"""
-        x, y = self.state
-
-        # Mappatura delle azioni (0=UP, 1=DOWN, 2=LEFT, 3=RIGHT)
-        if action == 0:  # UP
-            x = max(0, x - 1)
-        elif action == 1:  # DOWN
-            x = min(self.grid_height - 1, x + 1)
-        elif action == 2:  # LEFT
-            y = max(0, y - 1)
-        elif action == 3:  # RIGHT
-            y = min(self.grid_width - 1, y + 1)
-
-        # Gestione del vento (spostamento casuale verso l'alto)
-        if x >= 3 and x <= 5:  # Le righe 3, 4 e 5 sono ventose
-            x = max(0, x - self.wind_map[y])
+    def encode(self, state):
+        """Converte uno stato (x, y) nell'indice intero x * grid_width + y."""
+        x, y = state
+        return x * self.grid_width + y
 
-        self.state = (x, y)
+    def decode(self, index):
+        """Converte un indice intero nello stato (x, y)."""
+        return divmod(index, self.grid_width)
 
-        # Verifica se siamo arrivati al goal
-        done = self.state == self.goal_position
-        reward = -1  # Penalità per ogni passo
-        if done:
-            reward = 0  # Ricompensa quando arriviamo al goal
+    def _index(self, state):
+        # Indice intero dello stato, senza conversioni in modalità flat_obs
+        return state if self.flat_obs else state[0] * self.grid_width + state[1]
 
-        return self.state, reward, done, False, {}
+    def step(self, action):
+        """Esegui un'azione nell'ambiente"""
+        s = self._index(self.state)
+        self.state = self._obs[self._next[s][action]]
+        return self.state, self._reward[s][action], self._done[s][action], False, {}
+
+    def simulate_step(self, state, action):
+        """
+        Simula la transizione da uno stato dato senza modificare lo stato dell'ambiente.
+        """
+        s = self._index(state)
+        return self._obs[self._next[s][action]], self._reward[s][action], self._done[s][action], {}
+
+    @property
+    def renderer(self):
+        """GridRenderer con lo sfondo statico calcolato una sola volta (anche frame RGB)."""
+        if self._renderer is None:
+            self._renderer = self._make_renderer()
+        return self._renderer
+
+    def _make_renderer(self):
+        # 'G' rappresenta l'obiettivo (disegnato sopra l'agente)
+        return GridRenderer(self.grid_height, self.grid_width, [("G", self.terminal_mask, True)])
 
     def render(self):
         """Visualizza lo stato dell'ambiente"""
-        grid = np.zeros((self.grid_height, self.grid_width), dtype=str)
-        grid[:] = "."
-
-        x, y = self.state
-        grid[x, y] = "A"  # 'A' rappresenta l'agente
-        gx, gy = self.goal_position
-        grid[gx, gy] = "G"  # 'G' rappresenta l'obiettivo
-
-        print("\n".join(" ".join(row) for row in grid))
+        print(self.renderer.ascii(self._index(self.state)))
         print()
 
     def close(self):
@@ -0,0 +1,224 @@
+import heapq
+
+import numpy as np
+
+from environments.multibandit_problem import BanditEnvironment
+from environments.random_buffers import RandomBuffer
+from tutorials.tutorial1.streaming_stats import StreamingStats
+
+# Number of uniforms / noise samples drawn per bulk call in the large-k runners.
+BUFFER_SIZE = 4096
+
+
+class IncrementalArgmax:
+    """
+    Keeps track of the maximal entries of a value array that changes one entry at a time.
+
+    The set of arms tied at the maximum is stored as an indexable array plus a
+    position map, so a uniformly random maximal arm is drawn in O(1) and arms enter
+    or leave the set in O(1). A lazy max-heap finds the next maximum when the tied set
+    empties, in O(log k) amortized instead of a full O(k) scan.
+    """
+    def __init__(self, values, uniforms):
+        """
+        Parameters:
+            values (np.ndarray): Array of k values; the caller updates it in place and
+                                 then calls update(arm).
+            uniforms (RandomBuffer): Source of uniform [0, 1) numbers for tie-breaking.
+        """
+        self.values = values
+        self.uniforms = uniforms
+        k = len(values)
+        self.members = np.empty(k, dtype=np.int64)
+        self.position = np.full(k, -1, dtype=np.int64)
+        self._rebuild_heap()
+        # Initial tied set in one vectorized pass (all k arms when values start at zero).
+        self.max_value = float(values.max())
+        tied = np.flatnonzero(values == self.max_value)
+        self.size = len(tied)
+        self.members[:self.size] = tied
+        self.position[tied] = np.arange(self.size)
+
+    def _rebuild_heap(self):
+        self.heap = [(-value, arm) for arm, value in enumerate(self.values.tolist())]
+        heapq.heapify(self.heap)
+
+    def _add(self, arm):
+        self.members[self.size] = arm
+        self.position[arm] = self.size
+        self.size += 1
+
+    def _remove(self, arm):
+        index = self.position[arm]
+        last = self.members[self.size - 1]
+        self.members[index] = last
+        self.position[last] = index
+        self.position[arm] = -1
+        self.size -= 1
+
+    def _clear(self):
+        self.position[self.members[:self.size]] = -1
+        self.size = 0
+
+    def _refresh_ties(self):
+        """Finds the current maximum from the heap and collects every arm tied at it."""
+        heap, values = self.heap, self.values
+        # Drop stale entries: their arm has been updated since they were pushed.
+        while -heap[0][0] != values[heap[0][1]]:
+            heapq.heappop(heap)
+        self.max_value = -heap[0][0]
+        tied = []
+        while heap and -heap[0][0] == self.max_value:
+            entry = heapq.heappop(heap)
+            if values[entry[1]] == self.max_value:
+                tied.append(entry)
+                if self.position[entry[1]] < 0:
+                    self._add(entry[1])
+        for entry in tied:
+            heapq.heappush(heap, entry)
+
+    def update(self, arm):
+        """Must be called after values[arm] has changed."""
+        value = float(self.values[arm])
+        heapq.heappush(self.heap, (-value, arm))
+        if len(self.heap) > 4 * len(self.values):
+            # Too many stale entries: compact the heap back to one entry per arm.
+            self._rebuild_heap()
+
+        if value > self.max_value:
+            self._clear()
+            self._add(arm)
+            self.max_value = value
+        elif value == self.max_value:
+            if self.position[arm] < 0:
+                self._add(arm)
+        elif self.position[arm] >= 0:
+            self._remove(arm)
+            if self.size == 0:
+                self._refresh_ties()
+
+    def sample(self):
+        """Returns a maximal arm, chosen uniformly at random among ties."""
+        return int(self.members[int(self.uniforms.next() * self.size)])
+
+
+def _run_large_k(policy, num_episodes, time_steps, k, seed):
+    rng = np.random.default_rng(seed)
+    reward_stats = StreamingStats(time_steps)
+    optimal_stats = StreamingStats(time_steps)
+
+    for episode in range(num_episodes):
+        env = BanditEnvironment(k, rng=rng, tape_length=BUFFER_SIZE)
+        Q = np.zeros(k)
+        counts = np.zeros(k)
+        state = policy.start(Q, counts, rng)
+        rewards = np.zeros(time_steps)
+        optimal_actions = np.zeros(time_steps)
+
+        for t in range(time_steps):
+            action = policy.select(state, t)
+            reward = env.get_reward(action)
+            rewards[t] = reward
+            optimal_actions[t] = action == env.optimal_action
+
+            counts[action] += 1
+            Q[action] += (reward - Q[action]) / counts[action]
+            policy.update(state, action)
+
+        reward_stats.update(rewards)
+        optimal_stats.update(optimal_actions)
+
+    return reward_stats.mean.copy(), optimal_stats.mean * 100
+
+
+class _EpsilonGreedy:
+    def __init__(self, epsilon):
+        self.epsilon = epsilon
+
+    def start(self, Q, counts, rng):
+        uniforms = RandomBuffer(rng.random, BUFFER_SIZE)
+        return uniforms, IncrementalArgmax(Q, uniforms), len(Q)
+
+    def select(self, state, t):
+        uniforms, argmax, k = state
+        if uniforms.next() < self.epsilon:
+            return int(uniforms.next() * k)
+        return argmax.sample()
+
+    @staticmethod
+    def update(state, action):
+        state[1].update(action)
+
+
+class _UCB:
+    def __init__(self, c):
+        self.c = c
+
+    def start(self, Q, counts, rng):
+        # 1/sqrt(N(a)) is maintained incrementally, so each step is a single fused pass.
+        inv_sqrt_counts = np.zeros(len(Q))
+        return Q, counts, inv_sqrt_counts, np.empty(len(Q))
+
+    def select(self, state, t):
+        Q, counts, inv_sqrt_counts, scores = state
+        k = len(Q)
+        if t < k:
+            # Every action is tried once first, as in run_experiment_ucb.
+            return t
+        np.multiply(inv_sqrt_counts, self.c * np.sqrt(np.log(t + 1)), out=scores)
+        scores += Q
+        return int(np.argmax(scores))
+
+    @staticmethod
+    def update(state, action):
+        Q, counts, inv_sqrt_counts, _ = state
+        inv_sqrt_counts[action] = 1.0 / np.sqrt(counts[action])
+
+
+def run_large_k_epsilon(epsilon, k=100_000, num_episodes=10, time_steps=10_000, seed=None):
+    """
+    Epsilon-greedy experiment for bandits with a very large number of arms.
+
+    The greedy arm is served by an IncrementalArgmax, so a step costs O(1) amortized
+    instead of the O(k) greedy selection of run_experiment_epsilon.
+
+    Parameters:
+        epsilon (float): Probability of selecting a random action (exploration).
+        k (int): Number of arms (default: 10^5).
+        num_episodes (int): Number of independent episodes.
+        time_steps (int): Number of steps per episode.
+        seed (int or None): Seed for the random number generator.
+
+    Returns:
+        avg_reward (np.ndarray): The average reward at each time step (averaged over episodes).
+        optimal_action_percent (np.ndarray): The percentage of times the optimal action was chosen.
+    """
+    return _run_large_k(_EpsilonGreedy(epsilon), num_episodes, time_steps, k, seed)
+
+
+def run_large_k_ucb(c, k=10_000, num_episodes=10, time_steps=50_000, seed=None):
+    """
+    UCB experiment for bandits with a very large number of arms.
+
+    The exploration bonus of every arm changes with ln(t) at every step, so the argmax
+    cannot be maintained incrementally; instead the bonus is computed for all arms in
+    one vectorized pass into a preallocated buffer, with no Python loop over arms.
+
+    UCB first tries every arm once, so the first k steps are a round-robin over the
+    arms; time_steps must exceed k for the upper-confidence selection to run at all.
+
+    Parameters:
+        c (float): Exploration parameter for UCB.
+        k (int): Number of arms (default: 10^4).
+        num_episodes (int): Number of independent episodes.
+        time_steps (int): Number of steps per episode; must be greater than k.
+        seed (int or None): Seed for the random number generator.
+
+    Returns:
+        avg_reward (np.ndarray): The average reward at each time step (averaged over episodes).
+        optimal_action_percent (np.ndarray): The percentage of times the optimal action was chosen.
+    """
+    if time_steps <= k:
+        raise ValueError(f"time_steps ({time_steps}) must be greater than k ({k}): "
+                         "UCB spends the first k steps trying every arm once")
+    return _run_large_k(_UCB(c), num_episodes, time_steps, k, seed)
@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+
+
+def _import_pyplot(headless):
+    """Imports matplotlib.pyplot on first use, selecting the Agg backend when headless."""
+    import matplotlib
+    if headless:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def plot_with_error_band(ax, curve, std_error, label):
+    """Plots a curve with a shaded band of one standard error on each side."""
+    steps = np.arange(len(curve))
+    line, = ax.plot(steps, curve, label=label)
+    ax.fill_between(steps, curve - std_error, curve + std_error, color=line.get_color(), alpha=0.2)
+
+
+def render_figures(figures, output_dir=None, formats=("png",), headless=False):
+    """
+    Draws a batch of line plots.
+
+    matplotlib is only imported here, so modules that merely compute results never pay
+    for it. With an output directory every figure is written to disk and closed;
+    otherwise all figures are shown with a single blocking plt.show() at the end.
+
+    Parameters:
+        figures (list): One dict per figure with keys "name" (file name without
+                        extension), "title", "ylabel" and "curves", a list of
+                        (label, curve, std_error) tuples; std_error may be None.
+        output_dir (str or None): Directory to write the figures to.
+        formats (tuple): File formats to write, e.g. ("png", "svg").
+        headless (bool): Use the non-interactive Agg backend (no display needed).
+                         Implied when output_dir is given; without one nothing could
+                         be shown or written, so headless requires output_dir.
+
+    Returns:
+        list: Paths of the written files (empty when the figures are shown).
+    """
+    if headless and output_dir is None:
+        raise ValueError("headless rendering needs an output_dir: the figures would be neither shown nor saved")
+    headless = headless or output_dir is not None
+    plt = _import_pyplot(headless)
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    paths = []
+    for spec in figures:
+        fig, ax = plt.subplots(figsize=(12, 5))
+        for label, curve, std_error in spec["curves"]:
+            if std_error is None:
+                ax.plot(curve, label=label)
+            else:
+                plot_with_error_band(ax, curve, std_error, label)
+        ax.set_xlabel('Time Steps')
+        ax.set_ylabel(spec["ylabel"])
+        ax.set_title(spec["title"])
+        ax.legend()
+        if output_dir is not None:
+            for fmt in formats:
+                path = os.path.join(output_dir, f"{spec['name']}.{fmt}")
+                fig.savefig(path)
+                paths.append(path)
+            plt.close(fig)
+
+    if output_dir is None:
+        plt.show()
+    return paths
@@ -0,0 +1,107 @@
+import functools
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Default location of the cache, next to this file (ignored by git).
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".result_cache")
+
+# Source files whose content determines the results; editing any of them invalidates the cache.
+_VERSIONED_MODULES = [
+    os.path.join("environments", "multibandit_problem.py"),
+    os.path.join("environments", "selection_kernels.py"),
+    os.path.join("tutorials", "tutorial1", "run_experiments.py"),
+    os.path.join("tutorials", "tutorial1", "streaming_stats.py"),
+    os.path.join("tutorials", "tutorial1", "sweep.py"),
+]
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """Short hash of the source code of the bandit engine."""
+    digest = hashlib.sha256()
+    for path in _VERSIONED_MODULES:
+        with open(os.path.join(_REPO_ROOT, path), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of experiment results.
+
+    Each entry is a compressed .npz file named after the SHA-256 of its configuration
+    (algorithm, parameter, num_episodes, time_steps, k, seed, ... plus the code version).
+    The modification time of a file records its last use; when the cache grows beyond
+    max_bytes the least recently used entries are deleted.
+    """
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=512 * 1024 ** 2):
+        """
+        Parameters:
+            directory (str): Directory holding the cache entries (created if missing).
+            max_bytes (int): Size bound of the cache directory.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, config):
+        config = dict(config, code_version=code_version())
+        key = hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+        return os.path.join(self.directory, key + ".npz")
+
+    def get(self, config):
+        """
+        Looks up a configuration.
+
+        Parameters:
+            config (dict): JSON-serializable description of the experiment.
+
+        Returns:
+            dict or None: The stored arrays, or None on a cache miss.
+        """
+        path = self._path(config)
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        os.utime(path)  # Mark as most recently used
+        return arrays
+
+    def put(self, config, arrays):
+        """
+        Stores the arrays of a configuration and evicts old entries if needed.
+
+        Parameters:
+            config (dict): JSON-serializable description of the experiment.
+            arrays (dict): Mapping from names to np.ndarray.
+        """
+        path = self._path(config)
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, path)  # Atomic, so readers never see half-written files
+        self.evict()
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz") and not name.endswith(".tmp.npz"):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+    def clear(self):
+        """Deletes every entry."""
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                os.remove(os.path.join(self.directory, name))
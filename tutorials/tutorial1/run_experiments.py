@@ -1,11 +1,25 @@
 import numpy as np
-import matplotlib.pyplot as plt
 
-# Import the BanditEnvironment from our custom multi-armed bandit implementation.
-from environments.multibandit_problem import BanditEnvironment
+# Import the batched bandit environment from our custom multi-armed bandit implementation.
+from environments.multibandit_problem import BatchedBanditEnvironment
+from environments import selection_kernels
+from tutorials.tutorial1.streaming_stats import StreamingStats
 
+# Number of time steps of reward noise drawn per bulk call in the batched engine.
+NOISE_TAPE_LENGTH = 100
 
-def run_experiment_epsilon(env_class, epsilon, num_episodes=2000, time_steps=1000, **env_kwargs):
+
+def _summarize(reward_stats, optimal_stats, return_stats):
+    """Turns the streaming statistics into the (avg_reward, optimal_action_percent) curves."""
+    avg_reward = reward_stats.mean.copy()
+    optimal_action_percent = optimal_stats.mean * 100
+    if return_stats:
+        return avg_reward, optimal_action_percent, reward_stats, optimal_stats
+    return avg_reward, optimal_action_percent
+
+
+def run_experiment_epsilon(env_class, epsilon, num_episodes=2000, time_steps=1000, return_stats=False,
+                           policy_rng=None, **env_kwargs):
     """
     Runs the k-armed bandit experiment using the epsilon-greedy policy.
 
@@ -14,50 +28,54 @@ def run_experiment_epsilon(env_class, epsilon, num_episodes=2000, time_steps=100
         epsilon (float): Probability of selecting a random action (exploration).
         num_episodes (int): Number of independent episodes.
         time_steps (int): Number of steps per episode.
+        return_stats (bool): If True, also return the StreamingStats of the reward and of the
+                             optimal-action indicator (for standard-error bands).
+        policy_rng (np.random.Generator or None): Source of randomness of the action selection
+                                                  (a fresh, unseeded generator by default).
         env_kwargs: Additional keyword arguments to pass to the environment constructor (e.g., k=10).
 
     Returns:
         avg_reward (np.ndarray): The average reward at each time step (averaged over episodes).
         optimal_action_percent (np.ndarray): The percentage of times the optimal action was chosen.
+        reward_stats, optimal_stats (StreamingStats): Only returned when return_stats is True.
     """
-    rewards = np.zeros((num_episodes, time_steps))
-    optimal_actions = np.zeros((num_episodes, time_steps))
+    if policy_rng is None:
+        policy_rng = np.random.default_rng()
+    reward_stats = StreamingStats(time_steps)
+    optimal_stats = StreamingStats(time_steps)
 
     for episode in range(num_episodes):
+        # Only the current episode is kept in memory; it is folded into the running statistics.
+        rewards = np.zeros(time_steps)
+        optimal_actions = np.zeros(time_steps)
         env = env_class(**env_kwargs)
         # Initialize estimated action values (Q) and action counts.
         Q = np.zeros(env.k)
         action_counts = np.zeros(env.k)
 
         for t in range(time_steps):
-            # Epsilon-greedy action selection:
-            if np.random.rand() < epsilon:
-                action = np.random.randint(0, env.k)
-            else:
-                # In case of ties, break them randomly.
-                max_estimate = np.max(Q)
-                candidates = np.where(Q == max_estimate)[0]
-                action = np.random.choice(candidates)
+            # Epsilon-greedy action selection (ties broken randomly), shared with the batched engine.
+            action = selection_kernels.epsilon_greedy(Q[None], epsilon, policy_rng)[0]
 
             # Check if the selected action is the optimal action.
             if action == env.optimal_action:
-                optimal_actions[episode, t] = 1
+                optimal_actions[t] = 1
 
             # Obtain reward from the environment.
             reward = env.get_reward(action)
-            rewards[episode, t] = reward
+            rewards[t] = reward
 
             # Update the estimated value using the sample-average method.
             action_counts[action] += 1
             Q[action] += (reward - Q[action]) / action_counts[action]
 
-    # Calculate the average reward and optimal action percentage over episodes.
-    avg_reward = rewards.mean(axis=0)
-    optimal_action_percent = optimal_actions.mean(axis=0) * 100
-    return avg_reward, optimal_action_percent
+        reward_stats.update(rewards)
+        optimal_stats.update(optimal_actions)
+
+    return _summarize(reward_stats, optimal_stats, return_stats)
 
 
-def run_experiment_ucb(env_class, c, num_episodes=2000, time_steps=1000, **env_kwargs):
+def run_experiment_ucb(env_class, c, num_episodes=2000, time_steps=1000, return_stats=False, **env_kwargs):
     """
     Runs the k-armed bandit experiment using the Upper Confidence Bound (UCB) policy.
 
@@ -73,55 +91,51 @@ def run_experiment_ucb(env_class, c, num_episodes=2000, time_steps=1000, **env_k
         c (float): Exploration parameter for UCB.
         num_episodes (int): Number of independent episodes.
         time_steps (int): Number of steps per episode.
+        return_stats (bool): If True, also return the StreamingStats of the reward and of the
+                             optimal-action indicator (for standard-error bands).
         env_kwargs: Additional keyword arguments to pass to the environment constructor (e.g., k=10).
 
     Returns:
         avg_reward (np.ndarray): The average reward at each time step (averaged over episodes).
         optimal_action_percent (np.ndarray): The percentage of times the optimal action was chosen.
+        reward_stats, optimal_stats (StreamingStats): Only returned when return_stats is True.
     """
-    rewards = np.zeros((num_episodes, time_steps))
-    optimal_actions = np.zeros((num_episodes, time_steps))
+    reward_stats = StreamingStats(time_steps)
+    optimal_stats = StreamingStats(time_steps)
 
     for episode in range(num_episodes):
+        # Only the current episode is kept in memory; it is folded into the running statistics.
+        rewards = np.zeros(time_steps)
+        optimal_actions = np.zeros(time_steps)
         env = env_class(**env_kwargs)
         # Initialize estimated action values (Q) and action counts.
         Q = np.zeros(env.k)
         counts = np.zeros(env.k)
 
         for t in range(time_steps):
-            if t < env.k:
-                # Ensure each action is tried at least once to avoid division by zero.
-                action = t
-            else:
-                # Compute UCB values for each action.
-                ucb_values = np.zeros(env.k)
-                for a in range(env.k):
-                    # If an action has not been selected, set its UCB value to infinity.
-                    if counts[a] == 0:
-                        ucb_values[a] = float('inf')
-                    else:
-                        ucb_values[a] = Q[a] + c * np.sqrt(np.log(t + 1) / counts[a])
-                action = np.argmax(ucb_values)
+            # Untried actions have an infinite bound, so each action is tried once first.
+            action = selection_kernels.ucb1(Q[None], counts[None], t, c)[0]
 
             # Check if the selected action is optimal.
             if action == env.optimal_action:
-                optimal_actions[episode, t] = 1
+                optimal_actions[t] = 1
 
             # Obtain the reward from the environment.
             reward = env.get_reward(action)
-            rewards[episode, t] = reward
+            rewards[t] = reward
 
             # Update the action count and the estimated value for the chosen action.
             counts[action] += 1
             Q[action] += (reward - Q[action]) / counts[action]
 
-    # Compute the average reward and the percentage of optimal actions.
-    avg_reward = rewards.mean(axis=0)
-    optimal_action_percent = optimal_actions.mean(axis=0) * 100
-    return avg_reward, optimal_action_percent
+        reward_stats.update(rewards)
+        optimal_stats.update(optimal_actions)
+
+    return _summarize(reward_stats, optimal_stats, return_stats)
 
 
-def run_experiment_softmax(env_class, tau, num_episodes=2000, time_steps=1000, **env_kwargs):
+def run_experiment_softmax(env_class, tau, num_episodes=2000, time_steps=1000, return_stats=False,
+                           policy_rng=None, **env_kwargs):
     """
     Runs the k-armed bandit experiment using softmax action selection.
 
@@ -136,144 +150,346 @@ def run_experiment_softmax(env_class, tau, num_episodes=2000, time_steps=1000, *
                      - High tau makes the selection nearly uniform (random).
         num_episodes (int): Number of independent episodes.
         time_steps (int): Number of steps per episode.
+        return_stats (bool): If True, also return the StreamingStats of the reward and of the
+                             optimal-action indicator (for standard-error bands).
+        policy_rng (np.random.Generator or None): Source of randomness of the action selection
+                                                  (a fresh, unseeded generator by default).
         env_kwargs: Additional keyword arguments for the environment constructor (e.g., k=10).
 
     Returns:
         avg_reward (np.ndarray): The average reward at each time step (averaged over episodes).
         optimal_action_percent (np.ndarray): The percentage of times the optimal action was chosen.
+        reward_stats, optimal_stats (StreamingStats): Only returned when return_stats is True.
     """
-    rewards = np.zeros((num_episodes, time_steps))
-    optimal_actions = np.zeros((num_episodes, time_steps))
+    if policy_rng is None:
+        policy_rng = np.random.default_rng()
+    reward_stats = StreamingStats(time_steps)
+    optimal_stats = StreamingStats(time_steps)
 
     for episode in range(num_episodes):
+        # Only the current episode is kept in memory; it is folded into the running statistics.
+        rewards = np.zeros(time_steps)
+        optimal_actions = np.zeros(time_steps)
         env = env_class(**env_kwargs)
         # Initialize estimated action values (Q) and the count for each action.
         Q = np.zeros(env.k)
         action_counts = np.zeros(env.k)
 
         for t in range(time_steps):
-            # Compute the softmax probabilities for each action.
-            # We use Q/tau to scale the action values.
-            exp_values = np.exp(Q / tau)
-            probs = exp_values / np.sum(exp_values)
-
-            # Select an action according to the probability distribution.
-            action = np.random.choice(np.arange(env.k), p=probs)
+            # Sample an action from the softmax distribution (Gumbel-max, so small
+            # temperatures cannot overflow), shared with the batched engine.
+            action = selection_kernels.softmax(Q[None], tau, policy_rng)[0]
 
             # Check if the selected action is optimal.
             if action == env.optimal_action:
-                optimal_actions[episode, t] = 1
+                optimal_actions[t] = 1
 
             # Get the reward for the chosen action.
             reward = env.get_reward(action)
-            rewards[episode, t] = reward
+            rewards[t] = reward
 
             # Update the count and the estimated value for the action using sample averaging.
             action_counts[action] += 1
             Q[action] += (reward - Q[action]) / action_counts[action]
 
-    # Compute the average reward and the optimal action percentage over episodes.
-    avg_reward = rewards.mean(axis=0)
-    optimal_action_percent = optimal_actions.mean(axis=0) * 100
-    return avg_reward, optimal_action_percent
+        reward_stats.update(rewards)
+        optimal_stats.update(optimal_actions)
+
+    return _summarize(reward_stats, optimal_stats, return_stats)
+
+
+def _run_batched(select_actions, num_episodes, time_steps, k, rng):
+    """
+    Runs num_episodes independent k-armed bandit problems side by side.
+
+    Q, the action counts and the true values are kept as (num_episodes, k) arrays,
+    and every run is advanced one time step at a time with a single NumPy update.
+
+    Parameters:
+        select_actions (callable): Function (Q, counts, t, rng) -> actions returning
+                                   one action index per episode. If it has an `observe`
+                                   attribute, observe(actions, rewards) is called after
+                                   every step (for learners that keep their own state).
+        num_episodes (int): Number of independent episodes (bandit problems).
+        time_steps (int): Number of steps per episode.
+        k (int): Number of arms.
+        rng (np.random.Generator): Source of randomness for the whole batch.
+
+    Returns:
+        reward_stats (StreamingStats): Per-time-step statistics of the reward.
+        optimal_stats (StreamingStats): Per-time-step statistics of the optimal-action indicator.
+    """
+    rows = np.arange(num_episodes)
+    observe = getattr(select_actions, "observe", None)
+    env = BatchedBanditEnvironment(num_episodes, k, rng=rng, tape_length=min(time_steps, NOISE_TAPE_LENGTH))
+
+    Q = np.zeros((num_episodes, k))
+    counts = np.zeros((num_episodes, k))
+    reward_stats = StreamingStats(time_steps)
+    optimal_stats = StreamingStats(time_steps)
+
+    for t in range(time_steps):
+        actions = select_actions(Q, counts, t, rng)
+        rewards = env.get_rewards(actions)
+
+        # Sample-average update of the chosen arm in every episode at once.
+        counts[rows, actions] += 1
+        Q[rows, actions] += (rewards - Q[rows, actions]) / counts[rows, actions]
+        if observe is not None:
+            observe(actions, rewards)
+
+        reward_stats.update_batch(t, rewards)
+        optimal_stats.update_batch(t, (actions == env.optimal_action).astype(float))
+
+    return reward_stats, optimal_stats
+
+
+def _epsilon_greedy_selector(epsilon):
+    def select_actions(Q, counts, t, rng):
+        return selection_kernels.epsilon_greedy(Q, epsilon, rng)
+    return select_actions
+
+
+def _ucb_selector(c):
+    def select_actions(Q, counts, t, rng):
+        return selection_kernels.ucb1(Q, counts, t, c)
+    return select_actions
+
+
+def _softmax_selector(tau):
+    def select_actions(Q, counts, t, rng):
+        return selection_kernels.softmax(Q, tau, rng)
+    return select_actions
+
+
+class _GradientBanditSelector:
+    """Gradient bandit with the average reward so far as baseline; keeps its own preferences."""
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.H = None
+
+    def __call__(self, Q, counts, t, rng):
+        if t == 0:
+            self.H = np.zeros(Q.shape)
+            self.reward_total = np.zeros(Q.shape[0])
+        self.t = t
+        return selection_kernels.gradient_bandit(self.H, rng)
+
+    def observe(self, actions, rewards):
+        self.reward_total += rewards
+        baseline = self.reward_total / (self.t + 1)
+        selection_kernels.gradient_bandit_update(self.H, actions, rewards, baseline, self.alpha)
+
+
+def _thompson_selector(prior_std):
+    def select_actions(Q, counts, t, rng):
+        return selection_kernels.thompson_sampling(Q, counts, rng, prior_std)
+    return select_actions
+
+
+# Action-selection strategies available to the batched engine, keyed by algorithm name.
+BATCHED_SELECTORS = {
+    "epsilon": _epsilon_greedy_selector,
+    "ucb": _ucb_selector,
+    "softmax": _softmax_selector,
+    "gradient": _GradientBanditSelector,
+    "thompson": _thompson_selector,
+}
+
+
+def simulate_batched(algorithm, parameter, num_episodes, time_steps, k, rng):
+    """
+    Runs the batched engine for one (algorithm, parameter) pair.
+
+    Parameters:
+        algorithm (str): Key of BATCHED_SELECTORS ("epsilon", "ucb", "softmax", "gradient"
+                         or "thompson").
+        parameter (float): epsilon, c, tau, the step size alpha or the prior standard
+                           deviation, depending on the algorithm.
+        num_episodes (int): Number of independent episodes.
+        time_steps (int): Number of steps per episode.
+        k (int): Number of arms.
+        rng (np.random.Generator): Source of randomness for the whole batch.
+
+    Returns:
+        reward_stats (StreamingStats): Per-time-step statistics of the reward.
+        optimal_stats (StreamingStats): Per-time-step statistics of the optimal-action indicator.
+    """
+    select_actions = BATCHED_SELECTORS[algorithm](parameter)
+    return _run_batched(select_actions, num_episodes, time_steps, k, rng)
+
+
+def _run_batched_experiment(algorithm, parameter, num_episodes, time_steps, k, seed, return_stats):
+    rng = np.random.default_rng(seed)
+    reward_stats, optimal_stats = simulate_batched(algorithm, parameter, num_episodes, time_steps, k, rng)
+    return _summarize(reward_stats, optimal_stats, return_stats)
+
+
+def run_batched_experiment_epsilon(epsilon, num_episodes=2000, time_steps=1000, k=10, seed=None, return_stats=False):
+    """
+    Vectorized counterpart of run_experiment_epsilon: all episodes are simulated together.
+
+    Parameters:
+        epsilon (float): Probability of selecting a random action (exploration).
+        num_episodes (int): Number of independent episodes.
+        time_steps (int): Number of steps per episode.
+        k (int): Number of arms.
+        seed (int or None): Seed for the batch random number generator.
+        return_stats (bool): If True, also return the StreamingStats of the reward and of the
+                             optimal-action indicator (for standard-error bands).
+
+    Returns:
+        avg_reward (np.ndarray): The average reward at each time step (averaged over episodes).
+        optimal_action_percent (np.ndarray): The percentage of times the optimal action was chosen.
+        reward_stats, optimal_stats (StreamingStats): Only returned when return_stats is True.
+    """
+    return _run_batched_experiment("epsilon", epsilon, num_episodes, time_steps, k, seed, return_stats)
+
+
+def run_batched_experiment_ucb(c, num_episodes=2000, time_steps=1000, k=10, seed=None, return_stats=False):
+    """
+    Vectorized counterpart of run_experiment_ucb: all episodes are simulated together.
+
+    Parameters:
+        c (float): Exploration parameter for UCB.
+        num_episodes (int): Number of independent episodes.
+        time_steps (int): Number of steps per episode.
+        k (int): Number of arms.
+        seed (int or None): Seed for the batch random number generator.
+        return_stats (bool): If True, also return the StreamingStats of the reward and of the
+                             optimal-action indicator (for standard-error bands).
+
+    Returns:
+        avg_reward (np.ndarray): The average reward at each time step (averaged over episodes).
+        optimal_action_percent (np.ndarray): The percentage of times the optimal action was chosen.
+        reward_stats, optimal_stats (StreamingStats): Only returned when return_stats is True.
+    """
+    return _run_batched_experiment("ucb", c, num_episodes, time_steps, k, seed, return_stats)
+
+
+def run_batched_experiment_softmax(tau, num_episodes=2000, time_steps=1000, k=10, seed=None, return_stats=False):
+    """
+    Vectorized counterpart of run_experiment_softmax: all episodes are simulated together.
+
+    Arms are sampled with the Gumbel-max trick, so small temperatures do not overflow.
+
+    Parameters:
+        tau (float): Temperature parameter that controls exploration.
+        num_episodes (int): Number of independent episodes.
+        time_steps (int): Number of steps per episode.
+        k (int): Number of arms.
+        seed (int or None): Seed for the batch random number generator.
+        return_stats (bool): If True, also return the StreamingStats of the reward and of the
+                             optimal-action indicator (for standard-error bands).
+
+    Returns:
+        avg_reward (np.ndarray): The average reward at each time step (averaged over episodes).
+        optimal_action_percent (np.ndarray): The percentage of times the optimal action was chosen.
+        reward_stats, optimal_stats (StreamingStats): Only returned when return_stats is True.
+    """
+    return _run_batched_experiment("softmax", tau, num_episodes, time_steps, k, seed, return_stats)
+
+
+def run_batched_experiment_gradient(alpha, num_episodes=2000, time_steps=1000, k=10, seed=None,
+                                    return_stats=False):
+    """
+    Runs the k-armed bandit experiment with the gradient bandit algorithm, all episodes at once.
+
+    Parameters:
+        alpha (float): Step size of the preference updates.
+        num_episodes (int): Number of independent episodes.
+        time_steps (int): Number of steps per episode.
+        k (int): Number of arms.
+        seed (int or None): Seed for the batch random number generator.
+        return_stats (bool): If True, also return the StreamingStats of the reward and of the
+                             optimal-action indicator (for standard-error bands).
+
+    Returns:
+        avg_reward (np.ndarray): The average reward at each time step (averaged over episodes).
+        optimal_action_percent (np.ndarray): The percentage of times the optimal action was chosen.
+        reward_stats, optimal_stats (StreamingStats): Only returned when return_stats is True.
+    """
+    return _run_batched_experiment("gradient", alpha, num_episodes, time_steps, k, seed, return_stats)
+
+
+def run_batched_experiment_thompson(prior_std=1.0, num_episodes=2000, time_steps=1000, k=10, seed=None,
+                                    return_stats=False):
+    """
+    Runs the k-armed bandit experiment with Gaussian Thompson sampling, all episodes at once.
+
+    Parameters:
+        prior_std (float): Standard deviation of the Gaussian prior over the true values.
+        num_episodes (int): Number of independent episodes.
+        time_steps (int): Number of steps per episode.
+        k (int): Number of arms.
+        seed (int or None): Seed for the batch random number generator.
+        return_stats (bool): If True, also return the StreamingStats of the reward and of the
+                             optimal-action indicator (for standard-error bands).
+
+    Returns:
+        avg_reward (np.ndarray): The average reward at each time step (averaged over episodes).
+        optimal_action_percent (np.ndarray): The percentage of times the optimal action was chosen.
+        reward_stats, optimal_stats (StreamingStats): Only returned when return_stats is True.
+    """
+    return _run_batched_experiment("thompson", prior_std, num_episodes, time_steps, k, seed, return_stats)
+
+
+def _sweep_figures(results, values, symbol, prefix, name):
+    """Builds the average-reward and %-optimal-action figure specs of one sweep."""
+    reward_curves = []
+    optimal_curves = []
+    for value in values:
+        avg_reward, optimal_action_percent, reward_stats, optimal_stats = results[value]
+        reward_curves.append((f'{symbol} = {value}', avg_reward, reward_stats.std_error()))
+        optimal_curves.append((f'{symbol} = {value}', optimal_action_percent, optimal_stats.std_error() * 100))
+    return [
+        {"name": f"{name}_average_reward", "title": f"{prefix}: Average Reward vs. Time Steps",
+         "ylabel": "Average Reward", "curves": reward_curves},
+        {"name": f"{name}_optimal_action", "title": f"{prefix}: Optimal Action Percentage vs. Time Steps",
+         "ylabel": "% Optimal Action", "curves": optimal_curves},
+    ]
 
 
 if __name__ == "__main__":
-    # Set the environment class to test (BanditEnvironment for the multi-armed bandit problem).
-    env_class = BanditEnvironment
+    import argparse
+
+    from tutorials.tutorial1.plotting import render_figures
+    from tutorials.tutorial1.result_cache import ResultCache
+    from tutorials.tutorial1.sweep import run_sweep
+
+    parser = argparse.ArgumentParser(description="Tutorial 1: k-armed bandit experiments.")
+    parser.add_argument("--output-dir", default=None,
+                        help="Write the figures to this directory instead of showing them.")
+    parser.add_argument("--formats", nargs="+", default=["png"], help="File formats, e.g. png svg.")
+    parser.add_argument("--headless", action="store_true",
+                        help="Use the Agg backend; implied by --output-dir, and requires it.")
+    args = parser.parse_args()
+    if args.headless and args.output_dir is None:
+        parser.error("--headless needs --output-dir: the figures would be neither shown nor saved")
 
     # Define experimental parameters.
     time_steps = 1000
     num_episodes = 2000
     k = 10
 
-    # --- Epsilon-Greedy Experiment ---
     epsilons = [0, 0.01, 0.05, 0.1, 0.15, 0.2, 1]
-    epsilon_results = {}
-
-    for eps in epsilons:
-        avg_reward, optimal_action_percent = run_experiment_epsilon(env_class, eps, num_episodes, time_steps, k=k)
-        epsilon_results[eps] = (avg_reward, optimal_action_percent)
-
-    # Plot average reward for epsilon-greedy.
-    plt.figure(figsize=(12, 5))
-    for eps in epsilons:
-        avg_reward, _ = epsilon_results[eps]
-        plt.plot(avg_reward, label=f'epsilon = {eps}')
-    plt.xlabel('Time Steps')
-    plt.ylabel('Average Reward')
-    plt.title('Epsilon-Greedy: Average Reward vs. Time Steps')
-    plt.legend()
-    plt.show()
-
-    # Plot the percentage of optimal action selections over time for each epsilon value.
-    plt.figure(figsize=(12, 5))
-    for eps in epsilons:
-        _, optimal_action_percent = epsilon_results[eps]
-        plt.plot(optimal_action_percent, label=f'epsilon = {eps}')
-    plt.xlabel('Time Steps')
-    plt.ylabel('% Optimal Action')
-    plt.title('Optimal Action Percentage vs. Time Steps per Epsilon')
-    plt.legend()
-    plt.show()
-
-    # --- UCB Experiment ---
-    # Define different c values to test.
     c_values = [0.5, 1, 2, 5]
-    ucb_results = {}
-
-    for c in c_values:
-        avg_reward, optimal_action_percent = run_experiment_ucb(env_class, c, num_episodes, time_steps, k=k)
-        ucb_results[c] = (avg_reward, optimal_action_percent)
-
-    # Plot average reward for UCB.
-    plt.figure(figsize=(12, 5))
-    for c in c_values:
-        avg_reward, _ = ucb_results[c]
-        plt.plot(avg_reward, label=f'c = {c}')
-    plt.xlabel('Time Steps')
-    plt.ylabel('Average Reward')
-    plt.title('UCB: Average Reward vs. Time Steps')
-    plt.legend()
-    plt.show()
-
-    # Plot the percentage of optimal actions for UCB.
-    plt.figure(figsize=(12, 5))
-    for c in c_values:
-        _, optimal_action_percent = ucb_results[c]
-        plt.plot(optimal_action_percent, label=f'c = {c}')
-    plt.xlabel('Time Steps')
-    plt.ylabel('% Optimal Action')
-    plt.title('UCB: Optimal Action Percentage vs. Time Steps')
-    plt.legend()
-    plt.show()
-
-    # Define different temperature (tau) values to test.
     tau_values = [0.01, 0.1, 1, 10]
-    softmax_results = {}
-
-    for tau in tau_values:
-        avg_reward, optimal_action_percent = run_experiment_softmax(env_class, tau, num_episodes, time_steps, k=k)
-        softmax_results[tau] = (avg_reward, optimal_action_percent)
-
-    # Plot average reward for different temperature values.
-    plt.figure(figsize=(12, 5))
-    for tau in tau_values:
-        avg_reward, _ = softmax_results[tau]
-        plt.plot(avg_reward, label=f'tau = {tau}')
-    plt.xlabel('Time Steps')
-    plt.ylabel('Average Reward')
-    plt.title('Softmax: Average Reward vs. Time Steps')
-    plt.legend()
-    plt.show()
-
-    # Plot percentage of optimal actions for different temperature values.
-    plt.figure(figsize=(12, 5))
-    for tau in tau_values:
-        _, optimal_action_percent = softmax_results[tau]
-        plt.plot(optimal_action_percent, label=f'tau = {tau}')
-    plt.xlabel('Time Steps')
-    plt.ylabel('% Optimal Action')
-    plt.title('Softmax: Optimal Action Percentage vs. Time Steps')
-    plt.legend()
-    plt.show()
+
+    # All three sweeps run as one batch of jobs on a process pool, using the batched engine.
+    # Curves computed by earlier runs with the same configuration are read from the cache.
+    jobs = ([("epsilon", eps) for eps in epsilons]
+            + [("ucb", c) for c in c_values]
+            + [("softmax", tau) for tau in tau_values])
+    sweep_results = run_sweep(jobs, num_episodes, time_steps, k=k, return_stats=True, cache=ResultCache())
+
+    epsilon_results = {eps: sweep_results[("epsilon", eps)] for eps in epsilons}
+    ucb_results = {c: sweep_results[("ucb", c)] for c in c_values}
+    softmax_results = {tau: sweep_results[("softmax", tau)] for tau in tau_values}
+
+    # All six figures are rendered in one batch: written to disk, or shown with a single plt.show().
+    figures = (_sweep_figures(epsilon_results, epsilons, 'epsilon', 'Epsilon-Greedy', 'epsilon_greedy')
+               + _sweep_figures(ucb_results, c_values, 'c', 'UCB', 'ucb')
+               + _sweep_figures(softmax_results, tau_values, 'tau', 'Softmax', 'softmax'))
+    for path in render_figures(figures, args.output_dir, tuple(args.formats), args.headless):
+        print(f"Saved {path}")
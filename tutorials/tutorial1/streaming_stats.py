@@ -0,0 +1,91 @@
+import numpy as np
+
+
+class StreamingStats:
+    """
+    Running per-time-step mean and variance of a quantity observed over many episodes.
+
+    Memory depends only on time_steps: episodes are folded in one at a time with
+    Welford's update, or a whole batch at once with the parallel (Chan et al.)
+    merge, so the dense (num_episodes, time_steps) matrix is never built.
+    """
+    def __init__(self, time_steps):
+        self.count = np.zeros(time_steps)
+        self.mean = np.zeros(time_steps)
+        self.m2 = np.zeros(time_steps)  # Sum of squared deviations from the mean
+
+    def update(self, values):
+        """
+        Adds one episode (Welford's algorithm).
+
+        Parameters:
+            values (np.ndarray): Observations of the episode at every time step, shape (time_steps,).
+        """
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (values - self.mean)
+
+    def update_batch(self, t, values):
+        """
+        Adds a batch of observations of the same time step (one per episode).
+
+        Parameters:
+            t (int): Time step the observations belong to.
+            values (np.ndarray): Observations, shape (batch,).
+        """
+        n = values.size
+        batch_mean = values.mean()
+        batch_m2 = np.square(values - batch_mean).sum()
+        self._merge_at(t, n, batch_mean, batch_m2)
+
+    def merge(self, other):
+        """
+        Folds another StreamingStats over the same time steps into this one.
+
+        Parameters:
+            other (StreamingStats): Statistics of a disjoint set of episodes.
+        """
+        self._merge_at(slice(None), other.count, other.mean, other.m2)
+
+    def _merge_at(self, index, n, mean, m2):
+        count = self.count[index]
+        total = count + n
+        # Guard empty merges: 0/0 would poison the mean with NaNs.
+        safe_total = np.where(total > 0, total, 1)
+        delta = mean - self.mean[index]
+        self.mean[index] = self.mean[index] + delta * n / safe_total
+        self.m2[index] = self.m2[index] + m2 + delta ** 2 * count * n / safe_total
+        self.count[index] = total
+
+    def variance(self):
+        """Sample variance at every time step (0 where fewer than two episodes were seen)."""
+        return np.where(self.count > 1, self.m2 / np.maximum(self.count - 1, 1), 0.0)
+
+    def std_error(self):
+        """Standard error of the mean at every time step."""
+        return np.sqrt(self.variance() / np.maximum(self.count, 1))
+
+    def confidence_interval(self, z=1.96):
+        """
+        Normal-approximation confidence interval of the mean at every time step.
+
+        Parameters:
+            z (float): Number of standard errors on each side (default: 1.96, i.e. 95%).
+
+        Returns:
+            low (np.ndarray), high (np.ndarray): Lower and upper bounds of the interval.
+        """
+        half_width = z * self.std_error()
+        return self.mean - half_width, self.mean + half_width
+
+    def to_array(self):
+        """Packs count, mean and m2 into one (3, time_steps) array."""
+        return np.stack([self.count, self.mean, self.m2])
+
+    @classmethod
+    def from_array(cls, array):
+        """Inverse of to_array."""
+        stats = cls(array.shape[1])
+        stats.count[:], stats.mean[:], stats.m2[:] = array
+        return stats
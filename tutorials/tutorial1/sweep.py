@@ -0,0 +1,144 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from tutorials.tutorial1.run_experiments import simulate_batched
+from tutorials.tutorial1.streaming_stats import StreamingStats
+
+
+def _episode_chunks(num_episodes, chunk_size):
+    """Splits num_episodes into consecutive chunk sizes (the last chunk may be smaller)."""
+    full, rest = divmod(num_episodes, chunk_size)
+    return [chunk_size] * full + ([rest] if rest else [])
+
+
+def _run_chunk(task):
+    """
+    Worker entry point: simulates one episode chunk of one job and writes its
+    per-time-step statistics (count, mean, m2) into the shared results block.
+    """
+    shm_name, shape, job, chunk, algorithm, parameter, chunk_episodes, time_steps, k, seed_seq = task
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        results = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        rng = np.random.default_rng(seed_seq)
+        reward_stats, optimal_stats = simulate_batched(algorithm, parameter, chunk_episodes, time_steps, k, rng)
+        results[job, chunk, 0] = reward_stats.to_array()
+        results[job, chunk, 1] = optimal_stats.to_array()
+        del results
+    finally:
+        shm.close()
+
+
+def _job_seed(seed, algorithm, parameter):
+    """
+    Child SeedSequence of the root seed, keyed by the job itself rather than by its
+    position in the job list, so adding or removing jobs does not change the others.
+    """
+    digest = hashlib.sha256(repr((algorithm, float(parameter))).encode()).digest()
+    return np.random.SeedSequence(seed, spawn_key=(int.from_bytes(digest[:8], "little"),))
+
+
+def _simulate_jobs(jobs, num_episodes, time_steps, k, seed, chunk_size, max_workers):
+    """Runs every job on the pool and returns its merged (reward_stats, optimal_stats)."""
+    chunks = _episode_chunks(num_episodes, chunk_size)
+    # (job, chunk, metric [reward, optimal], field [count, mean, m2], time step)
+    shape = (len(jobs), len(chunks), 2, 3, time_steps)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 8))
+    try:
+        tasks = []
+        for job, (algorithm, parameter) in enumerate(jobs):
+            chunk_seeds = _job_seed(seed, algorithm, parameter).spawn(len(chunks))
+            for chunk, (chunk_episodes, chunk_seed) in enumerate(zip(chunks, chunk_seeds)):
+                tasks.append((shm.name, shape, job, chunk, algorithm, parameter,
+                              chunk_episodes, time_steps, k, chunk_seed))
+
+        max_workers = max_workers or os.cpu_count() or 1
+        if max_workers == 1:
+            for task in tasks:
+                _run_chunk(task)
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                list(pool.map(_run_chunk, tasks, chunksize=1))
+
+        results = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        merged = []
+        for job in range(len(jobs)):
+            reward_stats = StreamingStats(time_steps)
+            optimal_stats = StreamingStats(time_steps)
+            for chunk in range(len(chunks)):
+                reward_stats.merge(StreamingStats.from_array(results[job, chunk, 0]))
+                optimal_stats.merge(StreamingStats.from_array(results[job, chunk, 1]))
+            merged.append((reward_stats, optimal_stats))
+        del results
+    finally:
+        shm.close()
+        shm.unlink()
+    return merged
+
+
+def run_sweep(jobs, num_episodes=2000, time_steps=1000, k=10, seed=0, chunk_size=250, max_workers=None,
+              return_stats=False, cache=None):
+    """
+    Runs a parameter sweep of the batched bandit engine on a process pool.
+
+    Every (algorithm, parameter) job gets its own child of a root SeedSequence, and
+    each fixed-size episode chunk of that job gets its own grandchild. Because the
+    chunking does not depend on the number of workers and the partial statistics are
+    merged in a fixed order, results are identical bit-for-bit for any max_workers.
+    Workers write their partial statistics straight into a shared-memory block
+    instead of sending pickled arrays back.
+
+    Parameters:
+        jobs (list): List of (algorithm, parameter) pairs, e.g. [("epsilon", 0.1), ("ucb", 2)].
+        num_episodes (int): Number of independent episodes per job.
+        time_steps (int): Number of steps per episode.
+        k (int): Number of arms.
+        seed (int): Root seed of the sweep.
+        chunk_size (int): Number of episodes simulated by one task.
+        max_workers (int or None): Number of worker processes (default: os.cpu_count()).
+                                   With 1 worker the chunks run in the calling process.
+        return_stats (bool): If True, each result also carries the merged StreamingStats of
+                             the reward and of the optimal-action indicator.
+        cache (ResultCache or None): If given, jobs found in the cache are not recomputed
+                                     and newly computed jobs are stored in it.
+
+    Returns:
+        dict: Maps each (algorithm, parameter) job to (avg_reward, optimal_action_percent),
+              followed by (reward_stats, optimal_stats) when return_stats is True.
+    """
+    jobs = [tuple(job) for job in jobs]
+    # The parameter is keyed as a float, as in _job_seed: 0 and 0.0 are the same job
+    configs = {job: {"algorithm": job[0], "parameter": float(job[1]), "num_episodes": num_episodes,
+                     "time_steps": time_steps, "k": k, "seed": seed, "chunk_size": chunk_size}
+               for job in jobs}
+
+    stats = {}
+    if cache is not None:
+        for job in jobs:
+            arrays = cache.get(configs[job])
+            if arrays is not None:
+                stats[job] = (StreamingStats.from_array(arrays["reward"]),
+                              StreamingStats.from_array(arrays["optimal"]))
+
+    missing = [job for job in dict.fromkeys(jobs) if job not in stats]
+    if missing:
+        merged = _simulate_jobs(missing, num_episodes, time_steps, k, seed, chunk_size, max_workers)
+        for job, (reward_stats, optimal_stats) in zip(missing, merged):
+            stats[job] = (reward_stats, optimal_stats)
+            if cache is not None:
+                cache.put(configs[job], {"reward": reward_stats.to_array(),
+                                         "optimal": optimal_stats.to_array()})
+
+    sweep_results = {}
+    for job in jobs:
+        reward_stats, optimal_stats = stats[job]
+        result = (reward_stats.mean, optimal_stats.mean * 100)
+        if return_stats:
+            result += (reward_stats, optimal_stats)
+        sweep_results[job] = result
+    return sweep_results
@@ -0,0 +1,421 @@
+"""
+Matrix-form Bellman backups for the tutorial2 dynamic-programming agents.
+
+The environment's transition and reward tables are read once into a TabularModel;
+a sweep is then a few NumPy operations over all states instead of a Python loop
+calling env.simulate_step for every (state, action).
+
+Three sweep methods are available:
+    "jacobi"        every state is backed up from the values of the previous sweep
+                    (the agents' default).
+    "gauss_seidel"  red-black Gauss-Seidel: the cells are coloured like a
+                    checkerboard and each colour is backed up in place, the second
+                    half-sweep using the values just written by the first. Two
+                    vectorised half-sweeps, each over a precomputed copy of the
+                    tables of one colour. A sweep costs about as much as a Jacobi
+                    sweep; policy evaluation needs fewer of them, value iteration on
+                    the deterministic grids the same number.
+    "parallel"      Jacobi sweeps split across worker processes by model.sweeper
+                    (a tutorials.tutorial2.parallel_dp.ParallelSweeper).
+
+Values are flat arrays over the states s = row * columns + column; terminal states
+are never updated (they keep their initial value, 0 in the agents).
+
+solve_policy evaluates a policy exactly instead: a deterministic policy by pointer
+doubling along its paths, a stochastic one by solving the sparse linear system
+(I - gamma * P_pi) v = r_pi with scipy. prioritized_value_iteration backs
+up one state at a time in order of Bellman residual (prioritized sweeping).
+
+The iterative functions accept an optional callback(delta, seconds, backups),
+called after every sweep (see tutorials.tutorial2.telemetry); without one, sweeps
+are not timed.
+"""
+import contextlib
+import heapq
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+from environments.vector_grid import grid_shape
+
+METHODS = ("jacobi", "gauss_seidel", "parallel")
+# Relative difference below which greedy_policy treats two action values as equal
+TIE_TOLERANCE = 1e-10
+
+
+def predecessors(model):
+    """
+    Predecessor lists of every state: the non-terminal states with an action leading to it.
+
+    Returns:
+        indptr (np.ndarray), sources (np.ndarray): The predecessors of state t are
+        sources[indptr[t]:indptr[t + 1]] (CSR layout, each predecessor listed once).
+    """
+    sources = np.broadcast_to(np.arange(model.n_states), model.next_state.shape)
+    live = ~model.terminal[sources]
+    pairs = np.unique(np.stack([model.next_state[live], sources[live]], axis=1), axis=0)
+    indptr = np.zeros(model.n_states + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pairs[:, 0], minlength=model.n_states), out=indptr[1:])
+    return indptr, pairs[:, 1]
+
+
+class TabularModel:
+    """
+    Deterministic tabular model of a grid environment.
+
+    The tables are stored action-major, shape (A, S), so that reductions over actions
+    (max, expectation) run over contiguous rows; a preallocated (A, S) buffer holds
+    the action values of each sweep.
+
+    Attributes:
+        next_state (np.ndarray): Successor of every (action, state), shape (A, S).
+        reward (np.ndarray): Reward of every (action, state), shape (A, S).
+        terminal (np.ndarray): Boolean mask of terminal states, shape (S,).
+        rows, cols (int): Grid shape.
+        n_live (int): Number of non-terminal states.
+        sweeper (ParallelSweeper or None): Worker pool of the "parallel" method.
+    """
+    def __init__(self, env):
+        if getattr(env, "slippery", False):
+            raise ValueError("TabularModel needs deterministic transitions; the environment "
+                             "is slippery (use tutorials.tutorial2.sparse_dp.SparseModel)")
+        self.rows, self.cols = grid_shape(env)
+        self.next_state = np.ascontiguousarray(np.asarray(env.next_state, dtype=np.intp).T)
+        self.reward = np.ascontiguousarray(np.asarray(env.reward, dtype=np.float64).T)
+        self.terminal = np.asarray(env.terminal_mask, dtype=bool)
+        self.n_actions, self.n_states = self.next_state.shape
+        # States backed up by every sweep
+        self.n_live = int(np.count_nonzero(~self.terminal))
+        # ParallelSweeper used by method="parallel"
+        self.sweeper = None
+        self._q = np.empty((self.n_actions, self.n_states))
+        self._colours = None
+
+    def colours(self):
+        """
+        The two checkerboard colours of the non-terminal states, built on first use.
+
+        Returns:
+            list: (states, block) pairs, where states are the flat indices of one colour
+            and block holds that colour's next_state / reward columns (contiguous) and
+            work buffer, in the layout expected by q_values and _backup.
+        """
+        if self._colours is None:
+            row, col = np.divmod(np.arange(self.n_states), self.cols)
+            parity = (row + col) % 2
+            self._colours = []
+            for colour in (0, 1):
+                states = np.flatnonzero((parity == colour) & ~self.terminal)
+                if len(states):
+                    block = SimpleNamespace(next_state=np.ascontiguousarray(self.next_state[:, states]),
+                                            reward=np.ascontiguousarray(self.reward[:, states]),
+                                            n_states=len(states),
+                                            _q=np.empty((self.n_actions, len(states))))
+                    self._colours.append((states, block))
+        return self._colours
+
+
+def q_values(model, V, gamma, states=slice(None)):
+    """
+    Action values R[a, s] + gamma * V[next_state[a, s]] for a slice of states, shape (A, len).
+
+    The result is a view of the model's work buffer, overwritten by the next call.
+    """
+    q = model._q[:, states]
+    np.take(V, model.next_state[:, states], out=q)
+    q *= gamma
+    q += model.reward[:, states]
+    return q
+
+
+def _backup(model, V, gamma, states, policy):
+    """
+    New values of a slice of states:
+        policy None               -> max_a Q(s, a)                 (optimality backup)
+        policy of shape (S,)      -> Q(s, policy[s])               (deterministic policy)
+        policy of shape (S, A)    -> sum_a policy[s, a] * Q(s, a)  (stochastic policy)
+    """
+    if policy is None:
+        return q_values(model, V, gamma, states).max(axis=0)
+    if policy.ndim == 1:
+        rows = np.arange(*states.indices(model.n_states))
+        actions = policy[rows]
+        return model.reward[actions, rows] + gamma * V[model.next_state[actions, rows]]
+    return np.einsum("sa,as->s", policy[states], q_values(model, V, gamma, states))
+
+
+def _sweep(model, V, gamma, policy, method):
+    """One in-place "jacobi" or "gauss_seidel" sweep over all non-terminal states; returns the largest change."""
+    if method == "jacobi":
+        new = _backup(model, V, gamma, slice(None), policy)
+        new[model.terminal] = V[model.terminal]
+        delta = np.max(np.abs(new - V))
+        V[:] = new
+        return delta
+    delta = 0.0
+    for states, block in model.colours():
+        new = _backup(block, V, gamma, slice(None), None if policy is None else policy[states])
+        delta = max(delta, np.max(np.abs(new - V[states])))
+        V[states] = new
+    return delta
+
+
+@contextlib.contextmanager
+def _sweeping(model, V, gamma, policy, method, callback):
+    """
+    Context yielding a function that performs one sweep, reports it to callback
+    (timed, when one is given) and returns its largest change.
+
+    With method "parallel" the values stay in model.sweeper's shared memory for the
+    whole loop: V and the policy are copied in on entry and the values back into V
+    on exit, not at every sweep.
+    """
+    if method == "parallel":
+        if model.sweeper is None:
+            raise ValueError("method 'parallel' needs model.sweeper "
+                             "(a tutorials.tutorial2.parallel_dp.ParallelSweeper)")
+        model.sweeper.load(V, policy)
+
+        def sweep():
+            return model.sweeper.sweep(gamma)
+    elif method in METHODS:
+        def sweep():
+            return _sweep(model, V, gamma, policy, method)
+    else:
+        raise ValueError(f"Unknown method {method!r}: expected one of {METHODS}")
+
+    def reported_sweep():
+        if callback is None:
+            return sweep()
+        start = time.perf_counter()
+        delta = sweep()
+        callback(delta, time.perf_counter() - start, model.n_live)
+        return delta
+
+    try:
+        yield reported_sweep
+    finally:
+        if method == "parallel":
+            model.sweeper.store(V)
+
+
+def evaluate_policy(model, V, policy, gamma, theta, method="jacobi", callback=None):
+    """
+    Iterative policy evaluation, updating V in place until the largest change is < theta.
+
+    Parameters:
+        model (TabularModel): Environment model.
+        V (np.ndarray): Flat value array, shape (S,), updated in place.
+        policy (np.ndarray): Actions, shape (S,), or action probabilities, shape (S, A).
+        gamma (float): Discount factor.
+        theta (float): Convergence threshold.
+        method (str): "jacobi", "gauss_seidel" or "parallel".
+        callback (callable or None): Called as callback(delta, seconds, backups) after every sweep.
+
+    Returns:
+        int: Number of sweeps.
+    """
+    sweeps = 0
+    with _sweeping(model, V, gamma, policy, method, callback) as sweep:
+        while True:
+            sweeps += 1
+            if sweep() < theta:
+                return sweeps
+
+
+def sweep_policy(model, V, policy, gamma, sweeps, method="jacobi", theta=0.0, callback=None):
+    """
+    At most `sweeps` policy-evaluation sweeps (modified policy iteration), stopping
+    early once the largest change is < theta.
+
+    Returns:
+        float: Largest change in the last sweep.
+    """
+    delta = 0.0
+    with _sweeping(model, V, gamma, policy, method, callback) as sweep:
+        for _ in range(sweeps):
+            delta = sweep()
+            if delta < theta:
+                break
+    return delta
+
+
+def solve_policy(model, V, policy, gamma):
+    """
+    Exact policy evaluation, written into V; terminal states keep their value.
+
+    A deterministic policy is evaluated by pointer doubling: every state follows its
+    action to a single successor, so the value is the discounted sum of the rewards
+    along one path. Round k doubles the path length already summed,
+        acc[s] += gamma^(2^k) * acc[nxt[s]],  nxt[s] = nxt[nxt[s]],
+    and after about log2(S) rounds every path has reached a terminal state or
+    gamma^(2^k) is below the float resolution: a few dozen O(S) gathers, without
+    building or factorising a matrix. A stochastic policy is evaluated by solving
+    (I - gamma * P_pi) v = r_pi with a sparse direct solver.
+
+    Parameters:
+        model (TabularModel): Environment model.
+        V (np.ndarray): Flat value array, shape (S,), updated in place.
+        policy (np.ndarray): Actions, shape (S,), or action probabilities, shape (S, A).
+        gamma (float): Discount factor.
+    """
+    if policy.ndim == 1:
+        v = _follow_policy(model, V, policy, gamma)
+    else:
+        v = _solve_stochastic(model, V, policy, gamma)
+    if v is None or not np.all(np.isfinite(v)):
+        raise ValueError("Policy evaluation has no finite solution "
+                         "(with gamma=1 the policy must reach a terminal state from every state)")
+    V[:] = v
+
+
+def _follow_policy(model, V, policy, gamma):
+    """Pointer-doubling evaluation of a deterministic policy (None if a path never terminates)."""
+    states = np.arange(model.n_states)
+    live = ~model.terminal
+    sink = model.n_states
+    # Terminal states contribute their value once and then lead to a zero-valued sink
+    nxt = np.append(np.where(live, model.next_state[policy, states], sink), sink)
+    acc = np.append(np.where(live, model.reward[policy, states], V), 0.0)
+    scale = gamma
+    # A path that reaches the sink does so within S steps, i.e. ceil(log2(S + 1)) rounds;
+    # one still running after that is a cycle, only summable with gamma < 1
+    path_rounds = int(np.ceil(np.log2(sink + 1)))
+    rounds = 0
+    while scale >= np.finfo(float).eps and not np.all(nxt == sink):
+        if rounds > path_rounds and scale >= 1.0:
+            return None
+        acc += scale * acc[nxt]
+        nxt = nxt[nxt]
+        scale *= scale
+        rounds += 1
+    return acc[:sink]
+
+
+def exact_evaluation_cost(model, gamma):
+    """
+    Estimated cost of solve_policy for a deterministic policy, in Jacobi sweeps: each
+    doubling round gathers twice over the states, a sweep once per action.
+
+    Returns:
+        int: At least 1.
+    """
+    rounds = np.ceil(np.log2(model.n_states + 1))
+    if gamma < 1.0:
+        rounds = min(rounds, np.ceil(np.log2(np.log(np.finfo(float).eps) / np.log(gamma))))
+    return max(1, int(np.ceil(2 * rounds / model.n_actions)))
+
+
+def _solve_stochastic(model, V, policy, gamma):
+    """Sparse direct solve of (I - gamma * P_pi) v = r_pi for action probabilities (S, A)."""
+    states = np.arange(model.n_states)
+    live = ~model.terminal
+    rows = np.tile(states, model.n_actions)
+    cols = model.next_state.ravel()
+    probs = policy.T.ravel()
+    reward = np.einsum("sa,as->s", policy, model.reward)
+    # Terminal rows stay identity rows: v[s] = V[s]
+    P = scipy.sparse.csr_matrix((gamma * probs * live[rows], (rows, cols)),
+                                shape=(model.n_states, model.n_states))
+    A = scipy.sparse.identity(model.n_states, format="csr") - P
+    return scipy.sparse.linalg.spsolve(A.tocsc(), np.where(live, reward, V))
+
+
+def value_iteration(model, V, gamma, theta, method="jacobi", callback=None):
+    """
+    Value iteration, updating V in place until the largest change is < theta.
+
+    Parameters are as in evaluate_policy (without the policy).
+
+    Returns:
+        int: Number of sweeps.
+    """
+    sweeps = 0
+    with _sweeping(model, V, gamma, None, method, callback) as sweep:
+        while True:
+            sweeps += 1
+            if sweep() < theta:
+                return sweeps
+
+
+def prioritized_value_iteration(model, V, gamma, theta, callback=None):
+    """
+    Asynchronous value iteration driven by a priority queue of Bellman residuals.
+
+    Every non-terminal state whose residual |max_a Q(s, a) - V[s]| is at least theta
+    is queued; the state with the largest residual is backed up first, and only the
+    predecessors of an updated state have their residual recomputed and are
+    (re)queued. Stops when no residual is >= theta. V is updated in place.
+
+    There are no sweeps: callback, if given, is called after every n_live backups
+    (and once at the end) with the largest residual backed up in that batch.
+
+    Returns:
+        int: Number of state backups performed.
+    """
+    indptr, sources = predecessors(model)
+    indptr, sources = indptr.tolist(), sources.tolist()
+    next_state = model.next_state.T.tolist()
+    reward = model.reward.T.tolist()
+    values = V.tolist()
+
+    def backup(s):
+        return max(r + gamma * values[t] for r, t in zip(reward[s], next_state[s]))
+
+    residual = np.abs(_backup(model, V, gamma, slice(None), None) - V)
+    residual[model.terminal] = 0.0
+    priority = residual.tolist()
+    # heapq is a min-heap: priorities are stored negated. Entries whose priority no
+    # longer matches priority[s] are stale and skipped.
+    heap = [(-r, s) for s, r in enumerate(priority) if r >= theta]
+    heapq.heapify(heap)
+    backups = 0
+    if callback is not None:
+        batch, batch_delta, start = max(model.n_live, 1), 0.0, time.perf_counter()
+    while heap:
+        neg, s = heapq.heappop(heap)
+        if -neg != priority[s]:
+            continue
+        priority[s] = 0.0
+        values[s] = backup(s)
+        backups += 1
+        if callback is not None:
+            batch_delta = max(batch_delta, -neg)
+            if backups % batch == 0:
+                now = time.perf_counter()
+                callback(batch_delta, now - start, batch)
+                batch_delta, start = 0.0, now
+        for p in sources[indptr[s]:indptr[s + 1]]:
+            r = abs(backup(p) - values[p])
+            if r >= theta and r > priority[p]:
+                priority[p] = r
+                heapq.heappush(heap, (-r, p))
+    if callback is not None and backups % batch:
+        callback(batch_delta, time.perf_counter() - start, backups % batch)
+    V[:] = values
+    return backups
+
+
+def greedy_policy(model, V, gamma, policy=None):
+    """
+    Greedy actions with respect to V (first maximising action on ties).
+
+    With a current `policy`, a state keeps its action while that action's value is
+    within TIE_TOLERANCE (relative) of the best one: otherwise round-off between
+    equally good actions can make policy iteration switch actions forever. Terminal
+    states keep their action from `policy` (0 if no policy is given).
+
+    Returns:
+        np.ndarray: Integer actions, shape (S,).
+    """
+    q = q_values(model, V, gamma)
+    greedy = np.argmax(q, axis=0)
+    if policy is None:
+        return np.where(model.terminal, 0, greedy)
+    best = q[greedy, np.arange(model.n_states)]
+    current = q[policy, np.arange(model.n_states)]
+    tied = current >= best - TIE_TOLERANCE * np.maximum(np.abs(best), 1.0)
+    return np.where(model.terminal | tied, policy, greedy)
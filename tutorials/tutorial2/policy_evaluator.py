@@ -1,33 +1,39 @@
 import numpy as np
 
+from environments.vector_grid import grid_shape
+from tutorials.tutorial2.bellman import TabularModel, evaluate_policy
+from tutorials.tutorial2.parallel_dp import ParallelSweeper
+from tutorials.tutorial2.telemetry import NULL_TELEMETRY, reporter
+
 class PolicyEvaluator:
     """
     Performs iterative policy evaluation using an equiprobable policy
     (each action has a probability of 1/4).
+
+    Sweeps are matrix-form Bellman backups over the environment's transition
+    tables (see tutorials.tutorial2.bellman); method selects "jacobi" (the
+    default), "gauss_seidel" (red-black, in place) or "parallel" (Jacobi sweeps
+    split across `workers` processes, see tutorials.tutorial2.parallel_dp).
+
+    telemetry (see tutorials.tutorial2.telemetry) receives a record per sweep; by
+    default nothing is recorded.
     """
-    def __init__(self, env, theta=1e-4, gamma=1.0):
+    def __init__(self, env, theta=1e-4, gamma=1.0, method="jacobi", telemetry=NULL_TELEMETRY,
+                 workers=None):
         self.env = env
         self.theta = theta
         self.gamma = gamma
-        self.value = np.zeros((env.grid_size, env.grid_size))
+        self.method = method
+        self.telemetry = telemetry
+        self.model = TabularModel(env)
+        if method == "parallel":
+            self.model.sweeper = ParallelSweeper(self.model, workers)
+        self.value = np.zeros(grid_shape(env))
 
     def evaluate(self):
-        while True:
-            delta = 0
-            for r in range(self.env.grid_size):
-                for c in range(self.env.grid_size):
-                    state = (r, c)
-                    if state in self.env.terminal_states:
-                        continue
-                    v_old = self.value[r, c]
-                    v_new = 0
-                    for action in range(self.env.action_space.n):
-                        next_state, reward, done, _ = self.env.simulate_step(state, action)
-                        nr, nc = next_state
-                        # Equiprobable policy: each action chosen with probability 1/4
-                        v_new += (1 / self.env.action_space.n) * (reward + self.gamma * self.value[nr, nc])
-                    self.value[r, c] = v_new
-                    delta = max(delta, abs(v_old - v_new))
-            if delta < self.theta:
-                break
-        return self.value
\ No newline at end of file
+        n_actions = self.env.action_space.n
+        # Equiprobable policy: each action chosen with probability 1/4
+        policy = np.full((self.model.n_states, n_actions), 1 / n_actions)
+        evaluate_policy(self.model, self.value.reshape(-1), policy, self.gamma, self.theta, self.method,
+                        reporter(self.telemetry, self, "evaluation"))
+        return self.value
@@ -1,56 +1,126 @@
 import numpy as np
+
+from environments.vector_grid import grid_shape
+from tutorials.tutorial2.bellman import (TabularModel, evaluate_policy, exact_evaluation_cost,
+                                         greedy_policy, solve_policy, sweep_policy)
+from tutorials.tutorial2.parallel_dp import ParallelSweeper
+from tutorials.tutorial2.solution_cache import model_fingerprint
+from tutorials.tutorial2.telemetry import NULL_TELEMETRY, reporter, timed
+
+EVALUATION_MODES = ("auto", "exact", "modified", "iterative")
+
 class PolicyIterationAgent:
     """
     Implements Policy Iteration by alternating policy evaluation and policy improvement
     until the optimal policy is obtained.
+
+    Evaluation and improvement are matrix-form Bellman backups over the environment's
+    transition tables (see tutorials.tutorial2.bellman); method selects "jacobi"
+    (the default), "gauss_seidel" (red-black, in place) or "parallel" sweeps (Jacobi
+    sweeps split across `workers` processes, see tutorials.tutorial2.parallel_dp).
+
+    evaluation selects how each policy is evaluated:
+      - "exact": evaluate the policy exactly (bellman.solve_policy, pointer doubling)
+      - "modified": at most `sweeps` evaluation sweeps per improvement (modified policy
+        iteration); iteration stops once the policy is stable and the last sweep
+        changed the values by less than theta
+      - "iterative": sweep until the change is below theta (the classic algorithm)
+      - "auto": sweeps, which is all a warm-started evaluation usually needs, but no
+        more of them than an exact evaluation costs (bellman.exact_evaluation_cost,
+        a few sweeps) nor than `sweeps`; if the values are still moving after that,
+        the exact evaluation finishes the job
+
+    telemetry (see tutorials.tutorial2.telemetry) receives a record per evaluation
+    sweep, exact solve and improvement step, tagged with the round number
+    (self.iterations); by default nothing is recorded.
+
+    value and policy warm-start the iteration from a previous solution (e.g. one
+    solved with a nearby gamma) instead of zero values and the all-0 policy. With a
+    cache (SolutionCache), a cached solution of the same model, gamma and a theta at
+    most as large is returned without iterating; otherwise, unless value or policy
+    is given, the cached solution with the nearest gamma is the starting point. The
+    result is then added to the cache.
     """
-    def __init__(self, env, theta=1e-4, gamma=0.9):
+    def __init__(self, env, theta=1e-4, gamma=0.9, method="jacobi", evaluation="auto", sweeps=20,
+                 telemetry=NULL_TELEMETRY, value=None, policy=None, cache=None, workers=None):
+        if evaluation not in EVALUATION_MODES:
+            raise ValueError(f"Unknown evaluation {evaluation!r}: expected one of {EVALUATION_MODES}")
         self.env = env
         self.theta = theta
         self.gamma = gamma
-        self.value = np.zeros((env.grid_size, env.grid_size))
+        self.method = method
+        self.model = TabularModel(env)
+        if method == "parallel":
+            self.model.sweeper = ParallelSweeper(self.model, workers)
+        self.evaluation = evaluation
+        self.sweeps = sweeps
+        self.telemetry = telemetry
+        # Evaluation/improvement rounds performed by iterate_policy
+        self.iterations = 0
+        self.value = np.zeros(grid_shape(env))
         # Initialize the policy arbitrarily (all actions set to 0 initially)
-        self.policy = np.zeros((env.grid_size, env.grid_size), dtype=int)
+        self.policy = np.zeros(grid_shape(env), dtype=int)
+        if value is not None:
+            self.value[:] = np.reshape(value, self.value.shape)
+        if policy is not None:
+            self.policy[:] = np.reshape(policy, self.policy.shape)
+        self.warm_started = value is not None or policy is not None
+        self.cache = cache
+        self.fingerprint = None if cache is None else model_fingerprint(self.model)
 
     def policy_evaluation(self):
-        while True:
-            delta = 0
-            for r in range(self.env.grid_size):
-                for c in range(self.env.grid_size):
-                    state = (r, c)
-                    if state in self.env.terminal_states:
-                        continue
-                    v_old = self.value[r, c]
-                    action = self.policy[r, c]
-                    next_state, reward, done, _ = self.env.simulate_step(state, action)
-                    nr, nc = next_state
-                    self.value[r, c] = reward + self.gamma * self.value[nr, nc]
-                    delta = max(delta, abs(v_old - self.value[r, c]))
-            if delta < self.theta:
-                break
+        """Evaluates the current policy; returns the remaining change of the values (0 if exact)."""
+        value, policy = self.value.reshape(-1), self.policy.reshape(-1)
+        callback = reporter(self.telemetry, self, "evaluation", self.iterations)
+        if self.evaluation == "exact":
+            self._solve(value, policy)
+            return 0.0
+        if self.evaluation == "iterative":
+            evaluate_policy(self.model, value, policy, self.gamma, self.theta, self.method, callback)
+            return 0.0
+        sweeps = self.sweeps
+        if self.evaluation == "auto":
+            sweeps = min(sweeps, exact_evaluation_cost(self.model, self.gamma))
+        residual = sweep_policy(self.model, value, policy, self.gamma, sweeps, self.method,
+                                self.theta, callback)
+        if self.evaluation == "auto" and residual >= self.theta:
+            self._solve(value, policy)
+            return 0.0
+        return residual
+
+    def _solve(self, value, policy):
+        """Exact evaluation, reported as one record with delta 0."""
+        callback = reporter(self.telemetry, self, "exact_evaluation", self.iterations)
+        _, seconds = timed(callback, solve_policy, self.model, value, policy, self.gamma)
+        if callback is not None:
+            callback(0.0, seconds, self.model.n_live)
 
     def policy_improvement(self):
-        policy_stable = True
-        for r in range(self.env.grid_size):
-            for c in range(self.env.grid_size):
-                state = (r, c)
-                if state in self.env.terminal_states:
-                    continue
-                old_action = self.policy[r, c]
-                q_values = np.zeros(self.env.action_space.n)
-                for action in range(self.env.action_space.n):
-                    next_state, reward, done, _ = self.env.simulate_step(state, action)
-                    nr, nc = next_state
-                    q_values[action] = reward + self.gamma * self.value[nr, nc]
-                best_action = np.argmax(q_values)
-                self.policy[r, c] = best_action
-                if old_action != best_action:
-                    policy_stable = False
+        old_policy = self.policy.reshape(-1)
+        callback = reporter(self.telemetry, self, "improvement", self.iterations)
+        new_policy, seconds = timed(callback, greedy_policy, self.model, self.value.reshape(-1),
+                                    self.gamma, old_policy)
+        policy_stable = bool(np.array_equal(old_policy, new_policy))
+        if callback is not None:
+            callback(0.0, seconds, self.model.n_live, int(np.count_nonzero(new_policy != old_policy)))
+        self.policy[:] = new_policy.reshape(self.policy.shape)
         return policy_stable
 
     def iterate_policy(self):
+        self.iterations = 0
+        if self.cache is not None:
+            cached = self.cache.get(self.fingerprint, self.gamma, self.theta)
+            if cached is not None:
+                self.value.reshape(-1)[:], self.policy.reshape(-1)[:] = cached
+                return self.policy, self.value
+            nearest = None if self.warm_started else self.cache.nearest(self.fingerprint, self.gamma, self.theta)
+            if nearest is not None:
+                self.value.reshape(-1)[:], self.policy.reshape(-1)[:] = nearest
         while True:
-            self.policy_evaluation()
-            if self.policy_improvement():
+            self.iterations += 1
+            residual = self.policy_evaluation()
+            if self.policy_improvement() and residual < self.theta:
                 break
+        if self.cache is not None:
+            self.cache.put(self.fingerprint, self.gamma, self.theta, self.value, self.policy)
         return self.policy, self.value
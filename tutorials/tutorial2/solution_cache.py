@@ -0,0 +1,89 @@
+"""
+Cache of dynamic-programming solutions, keyed by model fingerprint and (gamma, theta).
+
+ValueIterationAgent and PolicyIterationAgent accept a SolutionCache. Before solving
+they look for a solution of the same model (same transition, reward and terminal
+tables, whatever environment object they came from):
+    - one with the same gamma and a theta at most as large is returned directly;
+    - otherwise the solution with the nearest gamma (then nearest theta) warm-starts
+      the solver, so a sweep over discount factors reuses the previous solutions.
+Every new solution is stored. With a directory, entries are also written as .npz
+files and loaded again by the next SolutionCache on that directory, so the cache
+survives across runs.
+"""
+import glob
+import hashlib
+import os
+
+import numpy as np
+
+
+def model_fingerprint(model):
+    """SHA-1 of the model's tables (TabularModel: next_state, reward, terminal)."""
+    digest = hashlib.sha1()
+    for table in (model.next_state, model.reward, model.terminal):
+        table = np.ascontiguousarray(table)
+        digest.update(f"{table.dtype.str}{table.shape}".encode())
+        digest.update(table.tobytes())
+    return digest.hexdigest()
+
+
+class SolutionCache:
+    """
+    Solutions (flat values, flat policy) indexed by (fingerprint, gamma, theta).
+    """
+    def __init__(self, directory=None):
+        """
+        Parameters:
+            directory (str or None): Where entries are persisted (None: memory only).
+        """
+        self.directory = directory
+        self.entries = {}
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            for path in sorted(glob.glob(os.path.join(directory, "*.npz"))):
+                with np.load(path) as data:
+                    key = (str(data["fingerprint"]), float(data["gamma"]), float(data["theta"]))
+                    self.entries[key] = (data["value"], data["policy"])
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, fingerprint, gamma, theta):
+        """
+        A solution that can be reused as is: same model and gamma, computed with a
+        threshold no larger than theta (the tightest one if several qualify).
+
+        Returns:
+            (value, policy) copies, or None.
+        """
+        keys = [key for key in self.entries
+                if key[0] == fingerprint and key[1] == gamma and key[2] <= theta]
+        if not keys:
+            return None
+        value, policy = self.entries[min(keys, key=lambda key: key[2])]
+        return value.copy(), policy.copy()
+
+    def nearest(self, fingerprint, gamma, theta):
+        """
+        The solution of the same model with the closest gamma (then closest theta),
+        to warm-start a new solve.
+
+        Returns:
+            (value, policy) copies, or None if the model has no cached solution.
+        """
+        keys = [key for key in self.entries if key[0] == fingerprint]
+        if not keys:
+            return None
+        value, policy = self.entries[min(keys, key=lambda key: (abs(key[1] - gamma), abs(key[2] - theta)))]
+        return value.copy(), policy.copy()
+
+    def put(self, fingerprint, gamma, theta, value, policy):
+        """Stores a solution (copies of the flat value and policy arrays)."""
+        value = np.array(value, dtype=np.float64).reshape(-1)
+        policy = np.array(policy).reshape(-1)
+        self.entries[(fingerprint, float(gamma), float(theta))] = (value, policy)
+        if self.directory is not None:
+            name = hashlib.sha1(f"{fingerprint}/{float(gamma)!r}/{float(theta)!r}".encode()).hexdigest()
+            np.savez(os.path.join(self.directory, f"{name}.npz"), fingerprint=fingerprint,
+                     gamma=gamma, theta=theta, value=value, policy=policy)
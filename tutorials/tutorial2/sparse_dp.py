@@ -0,0 +1,232 @@
+"""
+Model-based dynamic programming over a generic sparse model.
+
+A SparseModel holds, for every action a, a scipy.sparse matrix P[a] of shape
+(S, S) with the probability of *continuing* from s to s' (the missing mass of a
+row is the probability that the episode ends) and the expected rewards R[s, a].
+Terminal states have empty rows and zero reward, so their value is 0.
+
+SparseModel.from_env builds the model of every environment in `environments`:
+the deterministic grid worlds (any shape), slippery FrozenLake and Blackjack,
+or any environment exposing dense transition_probs / expected_reward tables.
+
+The solvers work on flat value arrays over the model's states; a sweep is a
+single sparse matrix-vector product, so models with millions of states fit.
+"""
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+# Value-iteration sweeps giving policy_iteration its initial policy; also the length
+# of the truncated evaluation of a policy whose exact evaluation is singular
+START_SWEEPS = 10
+
+
+class SparseModel:
+    """
+    Tabular MDP with sparse transition matrices.
+
+    Attributes:
+        n_states, n_actions (int): Model size.
+        P (scipy.sparse.csr_matrix): All actions stacked, shape (A * S, S); row
+            a * S + s holds the continuation probabilities of (s, a).
+        R (np.ndarray): Expected rewards, shape (S, A).
+        terminal (np.ndarray): Boolean mask of terminal states, shape (S,).
+    """
+    def __init__(self, P, R, terminal=None):
+        """
+        Parameters:
+            P (list of sparse matrices): One (S, S) continuation matrix per action.
+            R (np.ndarray): Expected rewards, shape (S, A).
+            terminal (np.ndarray or None): Boolean mask of terminal states.
+        """
+        self.n_states, self.n_actions = R.shape
+        self.terminal = (np.zeros(self.n_states, dtype=bool) if terminal is None
+                         else np.asarray(terminal, dtype=bool))
+        live = scipy.sparse.diags((~self.terminal).astype(np.float64))
+        self.P = scipy.sparse.vstack([live @ P_a for P_a in P], format="csr")
+        self.R = np.where(self.terminal[:, None], 0.0, R)
+        # Action-major copy (A, S): reductions over actions run over contiguous rows
+        self._R_actions = np.ascontiguousarray(self.R.T)
+
+    @classmethod
+    def from_tables(cls, next_state, reward, done, terminal=None, action_probs=None):
+        """
+        Model of an environment with tables next_state[s, a], reward[s, a], done[s, a].
+
+        Transitions with done[s, a] end the episode. action_probs (A, A), if given,
+        is the probability of executing action b when a is chosen (e.g. slippery ice).
+        """
+        n_states, n_actions = next_state.shape
+        states = np.arange(n_states)
+        # P_exec[b]: deterministic matrix of the executed action b
+        P_exec = [scipy.sparse.csr_matrix(((~done[:, b]).astype(np.float64), (states, next_state[:, b])),
+                                          shape=(n_states, n_states))
+                  for b in range(n_actions)]
+        if action_probs is None:
+            return cls(P_exec, np.asarray(reward, dtype=np.float64), terminal)
+        P = [sum(p * P_exec[b] for b, p in enumerate(action_probs[a]) if p > 0)
+             for a in range(n_actions)]
+        R = np.asarray(reward, dtype=np.float64) @ np.asarray(action_probs).T
+        return cls(P, R, terminal)
+
+    @classmethod
+    def from_env(cls, env):
+        """
+        Builds the model of an environment.
+
+        Supports the grid worlds (next_state / reward / done tables, slippery FrozenLake
+        included), Blackjack (expected_reward / done_prob) and any environment with dense
+        transition_probs[s, a, s'] and expected_reward[s, a].
+        """
+        if hasattr(env, "next_state"):
+            action_probs = None
+            if getattr(env, "slippery", False):
+                # On slippery ice the executed action is uniform, whatever was chosen
+                n = env.action_space.n
+                action_probs = np.full((n, n), 1.0 / n)
+            return cls.from_tables(env.next_state, env.reward, env.done,
+                                   getattr(env, "terminal_mask", None), action_probs)
+        if hasattr(env, "done_prob"):
+            # Blackjack: the only non-terminal transition is a hit that does not bust,
+            # which leaves the state unchanged
+            P = [scipy.sparse.diags(1.0 - env.done_prob[:, a], format="csr")
+                 for a in range(env.done_prob.shape[1])]
+            return cls(P, env.expected_reward)
+        if hasattr(env, "transition_probs"):
+            probs = env.transition_probs
+            P = [scipy.sparse.csr_matrix(probs[:, a, :]) for a in range(probs.shape[1])]
+            return cls(P, env.expected_reward, getattr(env, "terminal_mask", None))
+        raise TypeError(f"Cannot build a model of {type(env).__name__}: it exposes neither "
+                        "next_state/reward/done tables nor transition_probs/expected_reward")
+
+    def q_values(self, V, gamma):
+        """Action values R[s, a] + gamma * sum_s' P[a][s, s'] V[s'], shape (S, A)."""
+        return self.action_values(V, gamma).T
+
+    def action_values(self, V, gamma):
+        """The same action values laid out action-major, shape (A, S)."""
+        q = (self.P @ V).reshape(self.n_actions, self.n_states)
+        q *= gamma
+        q += self._R_actions
+        return q
+
+    def policy_matrix(self, policy):
+        """
+        Continuation matrix P_pi (S, S) and expected reward r_pi (S,) of a policy given
+        as actions, shape (S,), or action probabilities, shape (S, A).
+        """
+        states = np.arange(self.n_states)
+        if policy.ndim == 1:
+            return self.P[policy * self.n_states + states], self.R[states, policy]
+        P_pi = sum(scipy.sparse.diags(policy[:, a]) @ self.P[a * self.n_states:(a + 1) * self.n_states]
+                   for a in range(self.n_actions))
+        return P_pi.tocsr(), (policy * self.R).sum(axis=1)
+
+
+def greedy_policy(model, V, gamma):
+    """Greedy actions with respect to V (first maximising action on ties), shape (S,)."""
+    return np.argmax(model.action_values(V, gamma), axis=0)
+
+
+def evaluate_policy(model, policy, gamma, theta=None, V=None, max_sweeps=None):
+    """
+    Evaluates a policy.
+
+    With theta=None the linear system (I - gamma * P_pi) v = r_pi is solved exactly
+    with a sparse direct solver; otherwise v <- r_pi + gamma * P_pi v is iterated
+    from V (zeros by default) until the largest change is < theta, or for at most
+    max_sweeps sweeps if given.
+
+    Returns:
+        np.ndarray: State values, shape (S,).
+    """
+    P_pi, r_pi = model.policy_matrix(policy)
+    if theta is None:
+        A = scipy.sparse.identity(model.n_states, format="csc") - gamma * P_pi.tocsc()
+        V = scipy.sparse.linalg.spsolve(A, r_pi)
+        if not np.all(np.isfinite(V)):
+            raise ValueError("Policy evaluation has no finite solution "
+                             "(with gamma=1 the policy must end the episode from every state)")
+        return V
+    V = np.zeros(model.n_states) if V is None else V.copy()
+    sweeps = 0
+    while True:
+        new = r_pi + gamma * (P_pi @ V)
+        delta = np.max(np.abs(new - V))
+        V = new
+        sweeps += 1
+        if delta < theta or (max_sweeps is not None and sweeps >= max_sweeps):
+            return V
+
+
+def value_iteration(model, gamma, theta=1e-4, V=None, max_sweeps=None):
+    """
+    Value iteration with synchronous (Jacobi) sweeps, one sparse product each.
+
+    Parameters:
+        model (SparseModel): Model to solve.
+        gamma (float): Discount factor.
+        theta (float): Stop when the largest change of a sweep is < theta.
+        V (np.ndarray or None): Initial values (zeros by default).
+        max_sweeps (int or None): Optional limit on the number of sweeps.
+
+    Returns:
+        policy (np.ndarray): Greedy actions, shape (S,).
+        V (np.ndarray): State values, shape (S,).
+    """
+    V = np.zeros(model.n_states) if V is None else V.copy()
+    sweeps = 0
+    while True:
+        new = model.action_values(V, gamma).max(axis=0)
+        delta = np.max(np.abs(new - V))
+        V = new
+        sweeps += 1
+        if delta < theta or (max_sweeps is not None and sweeps >= max_sweeps):
+            break
+    return greedy_policy(model, V, gamma), V
+
+
+def policy_iteration(model, gamma, theta=None, policy=None):
+    """
+    Policy iteration: exact evaluation (or iterative with theta) and greedy improvement
+    until the policy is stable.
+
+    Without an initial policy, iteration starts from the greedy policy of
+    START_SWEEPS value-iteration sweeps rather than an arbitrary one. With gamma=1 a
+    policy that never ends the episode from some state has no exact evaluation (the
+    linear system is singular); such a policy is evaluated with START_SWEEPS
+    iterative sweeps instead, which is enough for the improvement step to move those
+    states onto better actions. Only a policy that is stable after an exact
+    evaluation is returned.
+
+    Returns:
+        policy (np.ndarray): Optimal actions, shape (S,).
+        V (np.ndarray): State values, shape (S,).
+
+    Raises:
+        ValueError: If the policy becomes stable without ending the episode from
+            every state (gamma=1 and no better action for the states concerned).
+    """
+    if policy is None:
+        policy, V = value_iteration(model, gamma, theta=0.0, max_sweeps=START_SWEEPS)
+    else:
+        policy, V = policy.copy(), None
+    while True:
+        try:
+            V = evaluate_policy(model, policy, gamma, theta, V)
+            exact = True
+        except ValueError:
+            V = evaluate_policy(model, policy, gamma, 0.0, V, max_sweeps=START_SWEEPS)
+            exact = False
+        q = model.q_values(V, gamma)
+        # Switch only to strictly better actions, so ties cannot make the policy cycle
+        best = np.argmax(q, axis=1)
+        states = np.arange(model.n_states)
+        improve = q[states, best] > q[states, policy] + 1e-12
+        if not improve.any():
+            if not exact:
+                raise ValueError("Policy iteration converged to a policy that does not end the "
+                                 "episode from every state; its values are not finite with gamma=1")
+            return policy, V
+        policy[improve] = best[improve]
@@ -0,0 +1,129 @@
+"""
+Convergence and timing telemetry for the tutorial2 dynamic-programming agents.
+
+PolicyEvaluator, PolicyIterationAgent and ValueIterationAgent accept a `telemetry`
+object and report one record per sweep (or per exact solve / policy improvement)
+to its on_record method. The default, Telemetry(), ignores them: the agents see
+telemetry.enabled == False and run their loops without any timing or callback.
+
+TelemetryRecorder keeps the records and exports them as JSON or CSV:
+
+    recorder = TelemetryRecorder()
+    agent = ValueIterationAgent(env, telemetry=recorder)
+    agent.iterate_value()
+    recorder.to_csv("vi_sweeps.csv")
+
+Every record is a dict with the keys in FIELDS:
+    agent           class name of the reporting agent
+    phase           "evaluation", "exact_evaluation", "improvement",
+                    "value_iteration", "prioritized" or "warm_start" (exact
+                    evaluation of a warm-start policy by ValueIterationAgent)
+    iteration       policy-iteration round (0 for the other agents)
+    sweep           index of the sweep within the phase, from 1
+    delta           largest value change of the sweep (largest residual backed
+                    up, for prioritized sweeping; 0 for an exact solve)
+    seconds         wall time of the sweep
+    backups         state backups performed
+    policy_changes  states whose action changed (improvement records only, else None)
+"""
+import csv
+import json
+import time
+
+FIELDS = ("agent", "phase", "iteration", "sweep", "delta", "seconds", "backups", "policy_changes")
+
+
+class Telemetry:
+    """
+    No-op telemetry, the agents' default. Subclass it and override on_record to
+    receive the records (e.g. to log them or stop a run that converges too slowly).
+    """
+    enabled = False
+
+    def on_record(self, record):
+        """Receives one record (a dict with the keys in FIELDS)."""
+
+
+class TelemetryRecorder(Telemetry):
+    """Collects every record in memory and exports them."""
+    enabled = True
+
+    def __init__(self):
+        self.records = []
+
+    def on_record(self, record):
+        self.records.append(record)
+
+    def clear(self):
+        self.records.clear()
+
+    def summary(self):
+        """
+        Totals per (agent, phase).
+
+        Returns:
+            dict: {"agent/phase": {"records", "seconds", "backups", "final_delta"}}; records is
+            the number of sweeps for the sweeping phases.
+        """
+        totals = {}
+        for record in self.records:
+            entry = totals.setdefault(f"{record['agent']}/{record['phase']}",
+                                      {"records": 0, "seconds": 0.0, "backups": 0, "final_delta": None})
+            entry["records"] += 1
+            entry["seconds"] += record["seconds"]
+            entry["backups"] += record["backups"]
+            entry["final_delta"] = record["delta"]
+        return totals
+
+    def to_json(self, path):
+        """Writes {"records": [...], "summary": {...}} to path."""
+        with open(path, "w") as f:
+            json.dump({"records": self.records, "summary": self.summary()}, f, indent=2)
+
+    def to_csv(self, path):
+        """Writes one row per record, with the columns in FIELDS."""
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(self.records)
+
+
+NULL_TELEMETRY = Telemetry()
+
+
+class SweepReporter:
+    """
+    Turns the bellman callbacks (delta, seconds, backups) of one phase into records.
+
+    Agents create one per phase with the fields that stay fixed (agent, phase,
+    iteration); the sweep counter starts from 1.
+    """
+    def __init__(self, telemetry, agent, phase, iteration=0):
+        self.telemetry = telemetry
+        self.fields = {"agent": type(agent).__name__, "phase": phase, "iteration": iteration}
+        self.sweep = 0
+
+    def __call__(self, delta, seconds, backups, policy_changes=None):
+        self.sweep += 1
+        self.telemetry.on_record(dict(self.fields, sweep=self.sweep, delta=float(delta),
+                                      seconds=seconds, backups=int(backups),
+                                      policy_changes=policy_changes))
+
+
+def reporter(telemetry, agent, phase, iteration=0):
+    """A SweepReporter for the phase, or None when telemetry is disabled (no timing at all)."""
+    return SweepReporter(telemetry, agent, phase, iteration) if telemetry.enabled else None
+
+
+def timed(callback, fn, *args):
+    """
+    Calls fn(*args); with a callback, also returns the elapsed wall time.
+
+    Returns:
+        (result, seconds): seconds is 0.0 when callback is None.
+    """
+    if callback is None:
+        return fn(*args), 0.0
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
@@ -1,45 +1,110 @@
+import warnings
+
 import numpy as np
+import scipy.sparse.linalg
+
+from environments.vector_grid import grid_shape
+from tutorials.tutorial2.bellman import (TabularModel, greedy_policy, prioritized_value_iteration,
+                                         solve_policy, value_iteration)
+from tutorials.tutorial2.parallel_dp import ParallelSweeper
+from tutorials.tutorial2.solution_cache import model_fingerprint
+from tutorials.tutorial2.telemetry import NULL_TELEMETRY, reporter, timed
 
 class ValueIterationAgent:
     """
     Implements Value Iteration by updating the value function using the Bellman optimality equation,
     and then extracting the optimal policy.
+
+    Sweeps are matrix-form Bellman backups over the environment's transition tables
+    (see tutorials.tutorial2.bellman); method selects "jacobi" (the default),
+    "gauss_seidel" (red-black, in place), "parallel" (Jacobi sweeps split across
+    `workers` processes, see tutorials.tutorial2.parallel_dp) or "prioritized":
+    asynchronous backups of one state at a time, largest Bellman residual first,
+    re-prioritizing only the predecessors of each updated state. After iterate_value, self.backups holds the number of state
+    backups performed.
+
+    telemetry (see tutorials.tutorial2.telemetry) receives a record per sweep and
+    one for the final policy extraction; by default nothing is recorded.
+
+    value and policy warm-start the iteration from a previous solution (e.g. one
+    solved with a nearby gamma) instead of zeros. A policy is first evaluated
+    exactly under this agent's gamma: its values are a lower bound of the optimal
+    ones, and equal to them when the policy is still optimal, so a single sweep can
+    be enough. The given value is the start only if there is no policy, or if the
+    policy has no finite values (e.g. it never ends the episode with gamma=1).
+
+    With a cache (SolutionCache), a cached solution of the same model, gamma and a
+    theta at most as large is returned without iterating; otherwise, unless value
+    or policy is given, the cached solution with the nearest gamma is the starting
+    point. The result is then added to the cache.
     """
-    def __init__(self, env, theta=1e-4, gamma=1.0):
+    def __init__(self, env, theta=1e-4, gamma=1.0, method="jacobi", telemetry=NULL_TELEMETRY,
+                 value=None, policy=None, cache=None, workers=None):
         self.env = env
         self.theta = theta
         self.gamma = gamma
-        self.value = np.zeros((env.grid_size, env.grid_size))
-        self.policy = np.zeros((env.grid_size, env.grid_size), dtype=int)
+        self.method = method
+        self.telemetry = telemetry
+        self.model = TabularModel(env)
+        if method == "parallel":
+            self.model.sweeper = ParallelSweeper(self.model, workers)
+        self.value = np.zeros(grid_shape(env))
+        self.policy = np.zeros(grid_shape(env), dtype=int)
+        if value is not None:
+            self.value[:] = np.reshape(value, self.value.shape)
+        if policy is not None:
+            self.policy[:] = np.reshape(policy, self.policy.shape)
+        self.warm_started = value is not None or policy is not None
+        # The warm-start policy is evaluated by iterate_value
+        self._evaluate_policy = policy is not None
+        self.backups = 0
+        self.cache = cache
+        self.fingerprint = None if cache is None else model_fingerprint(self.model)
 
     def iterate_value(self):
-        while True:
-            delta = 0
-            for r in range(self.env.grid_size):
-                for c in range(self.env.grid_size):
-                    state = (r, c)
-                    if state in self.env.terminal_states:
-                        continue
-                    v_old = self.value[r, c]
-                    q_values = []
-                    for action in range(self.env.action_space.n):
-                        next_state, reward, done, _ = self.env.simulate_step(state, action)
-                        nr, nc = next_state
-                        q_values.append(reward + self.gamma * self.value[nr, nc])
-                    self.value[r, c] = max(q_values)
-                    delta = max(delta, abs(v_old - self.value[r, c]))
-            if delta < self.theta:
-                break
+        value = self.value.reshape(-1)
+        if self.cache is not None:
+            cached = self.cache.get(self.fingerprint, self.gamma, self.theta)
+            if cached is not None:
+                value[:] = cached[0]
+                self.policy.reshape(-1)[:] = cached[1]
+                self.backups = 0
+                return self.policy, self.value
+            nearest = None if self.warm_started else self.cache.nearest(self.fingerprint, self.gamma, self.theta)
+            if nearest is not None:
+                value[:] = nearest[0]
+                self.policy.reshape(-1)[:] = nearest[1]
+                self._evaluate_policy = True
+        if self._evaluate_policy:
+            self._evaluate_policy = False
+            self._policy_values(value)
+        if self.method == "prioritized":
+            callback = reporter(self.telemetry, self, "prioritized")
+            self.backups = prioritized_value_iteration(self.model, value, self.gamma, self.theta, callback)
+        else:
+            callback = reporter(self.telemetry, self, "value_iteration")
+            sweeps = value_iteration(self.model, value, self.gamma, self.theta, self.method, callback)
+            self.backups = sweeps * self.model.n_live
         # Extract the optimal policy from the computed value function
-        for r in range(self.env.grid_size):
-            for c in range(self.env.grid_size):
-                state = (r, c)
-                if state in self.env.terminal_states:
-                    continue
-                q_values = []
-                for action in range(self.env.action_space.n):
-                    next_state, reward, done, _ = self.env.simulate_step(state, action)
-                    nr, nc = next_state
-                    q_values.append(reward + self.gamma * self.value[nr, nc])
-                self.policy[r, c] = np.argmax(q_values)
+        old_policy = self.policy.reshape(-1)
+        callback = reporter(self.telemetry, self, "improvement")
+        new_policy, seconds = timed(callback, greedy_policy, self.model, value, self.gamma, old_policy)
+        if callback is not None:
+            callback(0.0, seconds, self.model.n_live, int(np.count_nonzero(new_policy != old_policy)))
+        self.policy[:] = new_policy.reshape(self.policy.shape)
+        if self.cache is not None:
+            self.cache.put(self.fingerprint, self.gamma, self.theta, self.value, self.policy)
         return self.policy, self.value
+
+    def _policy_values(self, value):
+        """Replaces value with the exact values of the warm-start policy, if they are finite."""
+        callback = reporter(self.telemetry, self, "warm_start")
+        try:
+            with warnings.catch_warnings():
+                # A policy that never ends the episode makes the system singular
+                warnings.simplefilter("ignore", scipy.sparse.linalg.MatrixRankWarning)
+                _, seconds = timed(callback, solve_policy, self.model, value, self.policy.reshape(-1), self.gamma)
+        except ValueError:
+            return
+        if callback is not None:
+            callback(0.0, seconds, self.model.n_live)
@@ -1,9 +1,33 @@
 import sys
 import os
 from environments.grid_world  import SimpleGridWorld
+from environments.trajectory_store import EpisodeStore, EpisodeWriter, TrajectoryRecorder
 import numpy as np
 import random
 
+
+def _weighted_is_update(Q, C, policy, episode, discount_factor, b_prob):
+    """
+    Weighted importance-sampling update of Q, C and the greedy policy from one
+    episode given as a list of (state, action, reward), processed in reverse.
+    """
+    G = 0.0
+    W = 1.0
+    for t in reversed(range(len(episode))):
+        state_t, action_t, reward_t = episode[t]
+        G = discount_factor * G + reward_t
+        C[state_t][action_t] += W
+        Q[state_t][action_t] += (W / C[state_t][action_t]) * (G - Q[state_t][action_t])
+        # Update target policy to greedy
+        best_action = np.argmax(Q[state_t])
+        policy[state_t] = best_action
+
+        if action_t != best_action:
+            break
+        # update importance sampling ratio
+        W = W * (1.0 / b_prob)
+
+
 def off_policy_mc_control(env, num_episodes, behavior_policy, discount_factor=1.0):
     """
     Off-policy MC control using weighted importance sampling.
@@ -25,33 +49,63 @@ def off_policy_mc_control(env, num_episodes, behavior_policy, discount_factor=1.
         # Generate an episode using behavior policy b
         episode = []  # list of (state, action, reward)
         state = env.reset()
-        state_idx = state[0] * env.grid_size + state[1]
+        state_idx = env.encode(state)
         done = False
         while not done:
             action = behavior_policy(state_idx, env.action_space.n)
             next_state, reward, done, _ = env.step(action)
-            next_state_idx = next_state[0] * env.grid_size + next_state[1]
+            next_state_idx = env.encode(next_state)
             episode.append((state_idx, action, reward))
             state_idx = next_state_idx
 
-        G = 0.0
-        W = 1.0
         # Process episode in reverse
-        for t in reversed(range(len(episode))):
-            state_t, action_t, reward_t = episode[t]
-            G = discount_factor * G + reward_t
-            C[state_t][action_t] += W
-            Q[state_t][action_t] += (W / C[state_t][action_t]) * (G - Q[state_t][action_t])
-            # Update target policy to greedy
-            best_action = np.argmax(Q[state_t])
-            policy[state_t] = best_action
-
-            if action_t != best_action:
-                break
-            # update importance sampling ratio
-            # behavior policy is uniform random
-            b_prob = 1.0 / env.action_space.n
-            W = W * (1.0 / b_prob)
+        # behavior policy is uniform random
+        _weighted_is_update(Q, C, policy, episode, discount_factor, 1.0 / env.action_space.n)
+
+    return Q, policy
+
+
+def _state_index(env, state):
+    """Integer index of a state; environments created with flat_obs=True already return one."""
+    return state if getattr(env, "flat_obs", False) else env.encode(state)
+
+
+def record_behavior_episodes(env, num_episodes, behavior_policy, directory):
+    """
+    Plays num_episodes with the behavior policy and records them to an episode store,
+    so the same behavior data can be reused by many off-policy experiments.
+    Returns: EpisodeStore over the recorded data
+    """
+    with EpisodeWriter(directory) as writer:
+        recorder = TrajectoryRecorder(env, writer)
+        for _ in range(num_episodes):
+            state = recorder.reset()
+            state_idx = _state_index(env, state)
+            done = False
+            while not done:
+                action = behavior_policy(state_idx, env.action_space.n)
+                result = recorder.step(action)
+                # Five-element results (FrozenLake, CliffWalking) also report truncated
+                next_state, done = result[0], result[2] or (len(result) == 5 and result[3])
+                state_idx = _state_index(env, next_state)
+    return EpisodeStore(directory)
+
+
+def off_policy_mc_control_from_store(store, n_states, n_actions, discount_factor=1.0):
+    """
+    Off-policy MC control using weighted importance sampling on recorded episodes
+    (see record_behavior_episodes) generated by a uniform random behavior policy.
+    Episodes are read one at a time from the memory-mapped store.
+    Returns: Q, policy
+    """
+    Q = {state: np.zeros(n_actions) for state in range(n_states)}
+    C = {state: np.zeros(n_actions) for state in range(n_states)}
+    policy = {state: 0 for state in range(n_states)}
+
+    for episode in store:
+        transitions = list(zip(episode["states"].tolist(), episode["actions"].tolist(),
+                               episode["rewards"].tolist()))
+        _weighted_is_update(Q, C, policy, transitions, discount_factor, 1.0 / n_actions)
 
     return Q, policy
 
@@ -70,7 +124,7 @@ if __name__ == "__main__":
     for r in range(env.grid_size):
         for c in range(env.grid_size):
             state = r * env.grid_size + c
-            if (r, c) in env.terminal_states:
+            if env.terminal_mask[state]:
                 grid_policy[r, c] = 'T'
             else:
                 grid_policy[r, c] = action_symbols[optimal_policy[state]]